@@ -3,24 +3,46 @@
 SmartFace Client with LED indicators
 """
 
+import atexit
+import hashlib
+import logging
+import os
+
+# Low PortAudio latency on ALSA (Pi) - must be set before PyAudio starts.
+# Lower values react faster but risk input overruns on a busy CPU.
+os.environ.setdefault('PA_MIN_LATENCY_MSEC', '10')
+
 import pyaudio
+import queue
+import threading
 import wave
 import requests
+from requests.adapters import HTTPAdapter
+import shutil
 import subprocess
 import time
-import audioop
-from io import BytesIO
+import zlib
+from functools import lru_cache
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from smartface.config import (
     SAMPLE_RATE,
     CHUNK_SIZE,
     SILENCE_THRESHOLD,
-    ENERGY_THRESHOLD,
+    VAD_ONSET,
+    VAD_OFFSET,
     LISTEN_TIMEOUT,
+    VAD_PRE_SPEECH_STRIDE,
     TTS_RATE,
-    TTS_VOLUME
+    TTS_VOLUME,
+    TTS_CACHE_DIR,
+    TTS_CACHE_SIZE
 )
 
+from smartface.codec import mulaw_encode
+
 # Import LED controller
 try:
     from smartface.led import LEDController
@@ -29,71 +51,233 @@ except ImportError:
     LED_AVAILABLE = False
     print("⚠️  LED controller not found - running without LEDs")
 
+if CHUNK_SIZE not in (256, 512, 1024):
+    print(f"⚠️  CHUNK_SIZE={CHUNK_SIZE} - use 256, 512 or 1024 for a 16-64 ms VAD window")
+
+# Console separators
+_EQ = "=" * 60
+_SEP = "─" * 60
+
+# Hot-path messages (capture loop, upload thread) - shown with --verbose
+log = logging.getLogger('smartface')
+
+# Compiled VAD kernel (optional)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, boundscheck=False)
+    def _vad_step(samples, onset_sumsq, offset_sumsq, speaking, silence):
+        """
+        One VAD update for a chunk (energy, hysteresis and silence count)
+        
+        Args:
+            samples: int16 chunk
+            onset_sumsq: Sum of squares needed to start speaking
+            offset_sumsq: Sum of squares needed to keep speaking
+            speaking: Whether the previous chunk was speech
+            silence: Chunks of silence so far
+        
+        Returns:
+            (speaking, silence) after this chunk
+        """
+        total = 0
+        for i in range(samples.size):
+            v = np.int64(samples[i])
+            total += v * v
+        # Branchless: threshold and silence count are selected arithmetically
+        speaking = total > onset_sumsq - (onset_sumsq - offset_sumsq) * speaking
+        return speaking, (silence + 1) * (not speaking)
+else:
+    def _vad_step(samples, onset_sumsq, offset_sumsq, speaking, silence):
+        """One VAD update for a chunk (energy, hysteresis and silence count)"""
+        total = int(np.multiply(samples, samples, dtype=np.int32).sum(dtype=np.int64))
+        # Branchless: threshold and silence count are selected arithmetically
+        speaking = total > onset_sumsq - (onset_sumsq - offset_sumsq) * speaking
+        return speaking, (silence + 1) * (not speaking)
+
+# PortAudio is initialized once per process (it probes every ALSA device)
+_PA = None
+
+
+def _get_pa() -> pyaudio.PyAudio:
+    """Get the shared PyAudio instance, creating it on first use"""
+    global _PA
+    if _PA is None:
+        _PA = pyaudio.PyAudio()
+        atexit.register(_PA.terminate)
+    return _PA
+
+
+@lru_cache(maxsize=1)
+def _enum_devices() -> tuple:
+    """Device info for every PortAudio device (probed once per process)"""
+    p = _get_pa()
+    return tuple(p.get_device_info_by_index(i) for i in range(p.get_device_count()))
+
+def _score_to_sumsq(score: float) -> int:
+    """
+    Convert a VAD score to a per-chunk sum-of-squares threshold
+    
+    Args:
+        score: (dBFS + 100) / 100, in [0, 1]
+    
+    Returns:
+        Sum of squares of CHUNK_SIZE int16 samples at that level
+    """
+    rms = 32768.0 * 10 ** ((score * 100 - 100) / 20)
+    return int(rms * rms * CHUNK_SIZE)
+
+# Sample rate of cached TTS WAVs (espeak's native rate, forced for say)
+_TTS_WAV_RATE = 22050
+
+# Wire formats: raw 16-bit little-endian mono PCM, or μ-law (half the bytes)
+_CONTENT_TYPES = {
+    'l16': f'audio/L16; rate={SAMPLE_RATE}; channels=1',
+    'pcmu': f'audio/PCMU; rate={SAMPLE_RATE}; channels=1',
+}
+
 
 class SmartFaceClient:
     """Simple audio client with LED status indicators"""
     
-    def __init__(self, server_url: str):
+    def __init__(self, server_url: str, compress: bool = False, codec: str = 'l16'):
         # Fix URL if missing protocol
         if not server_url.startswith(('http://', 'https://')):
             server_url = f"http://{server_url}"
         
         self.server_url = server_url
-        self.p = pyaudio.PyAudio()
+        
+        # Upload encoding: μ-law and/or deflate (help on slow Wi-Fi)
+        self.compress = compress
+        self._encode = mulaw_encode if codec == 'pcmu' else None
+        self._upload_headers = {'Content-Type': _CONTENT_TYPES[codec]}
+        if compress:
+            self._upload_headers['Content-Encoding'] = 'deflate'
+        
+        # One keep-alive connection to the server for the whole session
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self.p = _get_pa()
         self.stream = None
         
+        # Filled by the PortAudio callback thread, drained by record()
+        self._ring = deque(maxlen=int(LISTEN_TIMEOUT * SAMPLE_RATE / CHUNK_SIZE) + 1)
+        
+        # VAD compares the chunk's sum of squares (no log, no sqrt) against
+        # the dBFS onset/offset thresholds converted once here
+        self._onset_sumsq = _score_to_sumsq(VAD_ONSET)
+        self._offset_sumsq = _score_to_sumsq(VAD_OFFSET)
+        
+        # Compile the VAD kernel now rather than on the first recording
+        _vad_step(np.zeros(CHUNK_SIZE, dtype=np.int16),
+                  self._onset_sumsq, self._offset_sumsq, False, 0)
+        
+        # Preallocated capture buffer: up to LISTEN_TIMEOUT seconds of PCM
+        # (plus slack for the last chunk)
+        self._buf = bytearray(int(LISTEN_TIMEOUT * SAMPLE_RATE * 2) + CHUNK_SIZE * 2)
+        self._view = memoryview(self._buf)
+        
+        # Streaming upload (raw PCM sent while still recording)
+        self._streaming = True
+        self._upload_thread = None
+        self._upload_result = None
+        
+        # TTS command, detected once (macOS 'say' or Linux/Pi 'espeak')
+        # Text goes in on stdin, so it is never parsed as options.
+        # _tts_synth renders to a WAV file (+ [path]) for the cache
+        self._tts_synth = None
+        if shutil.which('say'):
+            self._tts_cmd = ['say', '-r', str(TTS_RATE), '-f', '-']
+            self._tts_synth = self._tts_cmd + [
+                '--file-format=WAVE', f'--data-format=LEI16@{_TTS_WAV_RATE}', '-o'
+            ]
+        elif shutil.which('espeak'):
+            self._tts_cmd = ['espeak', '-s', str(TTS_RATE), '--stdin']
+            self._tts_synth = self._tts_cmd + ['-w']
+        else:
+            self._tts_cmd = None
+            print("⚠️  No TTS command found (say/espeak)")
+        self._tts_proc = None
+        
+        # Cached WAVs play through one long-lived PyAudio output stream,
+        # with TTS_VOLUME (percent) applied as a gain
+        self._tts_gain = TTS_VOLUME / 100
+        self._out_stream = None
+        self._out_rate = None
+        self._play_thread = None
+        
+        # TTS cache: WAVs are rendered in the background, and only for
+        # texts spoken more than once (one-off answers are never cached)
+        self._tts_dir = None
+        self._tts_seen = {}
+        self._tts_render = ThreadPoolExecutor(max_workers=1)
+        if self._tts_synth:
+            try:
+                os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+                self._tts_dir = TTS_CACHE_DIR
+            except OSError as e:
+                print(f"⚠️  TTS cache disabled: {e}")
+        
         # Initialize LED controller
         if LED_AVAILABLE:
             self.led = LEDController()
         else:
             self.led = None
         
-        print("="*60)
+        print(_EQ)
         print("🤖 SmartFace Client")
-        print("="*60)
+        print(_EQ)
         print(f"📡 Server: {server_url}\n")
         
         # Set idle state (RED LED)
         if self.led:
             self.led.set_idle()
         
-        # Test connection
-        try:
-            r = requests.get(f"{server_url}/health", timeout=5)
-            if r.status_code == 200:
-                print("✅ Connected to server\n")
-            else:
-                print(f"⚠️  Server error: {r.status_code}\n")
-        except Exception as e:
-            print(f"❌ Connection failed: {e}\n")
-            if self.led:
-                self.led.set_error()
+        # Probe the server while the microphone opens
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            health = ex.submit(self.session.get, f"{server_url}/health", timeout=5)
+            mic = ex.submit(self._open_stream)
+            
+            # Test connection
+            try:
+                r = health.result()
+                if r.status_code == 200:
+                    print("✅ Connected to server\n")
+                else:
+                    print(f"⚠️  Server error: {r.status_code}\n")
+            except Exception as e:
+                print(f"❌ Connection failed: {e}\n")
+                if self.led:
+                    self.led.set_error()
+            
+            # Re-raises microphone errors
+            mic.result()
         
-        # Start audio
-        try:
-            self.stream = self.p.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=SAMPLE_RATE,
-                input=True,
-                frames_per_buffer=CHUNK_SIZE
-            )
-            print("✅ Microphone ready\n")
-        except Exception as e:
-            print(f"❌ Microphone error: {e}")
-            if self.led:
-                self.led.set_error()
-            raise
-        # Lister les périphériques disponibles
+        # Open the speaker stream now rather than on the first reply
+        if self._tts_dir:
+            try:
+                self._open_output(_TTS_WAV_RATE)
+            except Exception as e:
+                print(f"⚠️  Speaker stream error: {e}")
+    
+    def _open_stream(self):
+        """Enumerate devices and open the microphone stream"""
+        # Lister les périphériques disponibles (probed once per process)
+        self._devices = _enum_devices()
         print("\n📋 Périphériques audio disponibles:")
-        for i in range(self.p.get_device_count()):
-            info = self.p.get_device_info_by_index(i)
+        for i, info in enumerate(self._devices):
             print(f"  [{i}] {info['name']} (in:{info['maxInputChannels']}, out:{info['maxOutputChannels']})")
         
         # Trouver le périphérique Bluetooth
         bluetooth_device = None
-        for i in range(self.p.get_device_count()):
-            info = self.p.get_device_info_by_index(i)
+        for i, info in enumerate(self._devices):
             # Chercher "bluez" ou le nom de vos écouteurs
             if 'bluez' in info['name'].lower() and info['maxInputChannels'] > 0:
                 bluetooth_device = i
@@ -108,59 +292,107 @@ class SmartFaceClient:
                 rate=SAMPLE_RATE,
                 input=True,
                 input_device_index=bluetooth_device,  # ← IMPORTANT
-                frames_per_buffer=CHUNK_SIZE
+                frames_per_buffer=CHUNK_SIZE,
+                stream_callback=self._on_audio
             )
             print("✅ Microphone prêt\n")
         except Exception as e:
             print(f"❌ Erreur microphone: {e}")
+            if self.led:
+                self.led.set_error()
             raise
     
-    def record(self) -> bytes:
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: hand the chunk to record() and keep going"""
+        self._ring.append(in_data)
+        return (None, pyaudio.paContinue)
+    
+    def record(self) -> memoryview:
         """Record audio until silence - BLUE LED ON"""
+        # Don't record our own voice
+        self._wait_tts()
+        
+        # Drop audio captured while we were busy
+        ring = self._ring
+        ring.clear()
+        
         print("🎙️  Listening... Speak now!")
         
         # 🔵 BLUE LED ON - Listening
         if self.led:
             self.led.set_listening()
         
-        frames = []
+        view = self._view
+        offset = 0
+        end = len(self._buf) - CHUNK_SIZE * 2
         silence = 0
         spoken = False
+        speaking = False
+        upload = None
+        chunk_index = 0
         start_time = time.time()
         
         try:
             while True:
                 # Timeout check
                 if time.time() - start_time > LISTEN_TIMEOUT:
-                    print("⏱️  Timeout")
+                    log.debug("⏱️  Timeout")
+                    break
+                
+                # Buffer full
+                if offset > end:
                     break
                 
-                # Read audio
-                data = self.stream.read(CHUNK_SIZE, exception_on_overflow=False)
-                frames.append(data)
+                # Next chunk from the callback (wait if none yet)
+                try:
+                    data = ring.popleft()
+                except IndexError:
+                    time.sleep(0.005)
+                    continue
+                
+                # Copy into the capture buffer
+                n = len(data)
+                view[offset:offset + n] = data
+                offset += n
                 
-                # Voice Activity Detection
-                rms = audioop.rms(data, 2)
+                # Stream the chunk if the upload is already running
+                if upload is not None:
+                    upload.put(data)
                 
-                if rms > ENERGY_THRESHOLD:
-                    if not spoken:
-                        print("🎤 Speech detected...")
+                # Nothing changes until speech starts, so check less often
+                if not spoken:
+                    chunk_index += 1
+                    if chunk_index % VAD_PRE_SPEECH_STRIDE:
+                        continue
+                
+                # Voice Activity Detection with hysteresis: louder to start
+                # speaking than to keep speaking (silence resets on speech)
+                samples = np.frombuffer(view[offset - n:offset], dtype=np.int16)
+                speaking, silence = _vad_step(
+                    samples, self._onset_sumsq, self._offset_sumsq, speaking, silence
+                )
+                
+                if speaking and not spoken:
+                    log.debug("🎤 Speech detected...")
+                    # Start uploading everything captured so far
+                    upload = self._start_upload(bytes(view[:offset]))
                     spoken = True
-                    silence = 0
-                elif spoken:
-                    silence += 1
                 
                 # Stop if silence after speech
                 if spoken and silence > SILENCE_THRESHOLD:
-                    print("🔇 Speech complete")
+                    log.debug("🔇 Speech complete")
                     break
         
         except KeyboardInterrupt:
             print("\n⏹️  Recording stopped")
+            self._finish_upload(upload)
+            self._upload_thread = None
             if self.led:
                 self.led.set_idle()
             return None
         
+        self._finish_upload(upload)
+        
         # 🔴 RED LED ON - Processing
         if self.led:
             self.led.set_processing()
@@ -169,43 +401,111 @@ class SmartFaceClient:
             print("❌ No speech detected")
             return None
         
-        # Convert to WAV
-        buf = BytesIO()
+        duration = offset / (SAMPLE_RATE * 2)
+        print(f"✅ Recorded {duration:.1f}s\n")
+        
+        # Raw PCM - the server knows the format from the content type.
+        # Zero-copy view into the capture buffer: valid until the next record()
+        return view[:offset]
+    
+    
+    def _start_upload(self, head: bytes):
+        """
+        Start streaming raw PCM to /process_stream in the background
+        
+        Args:
+            head: Audio captured before speech was detected
+        
+        Returns:
+            Queue to feed further chunks into (None ends the upload),
+            or None if the server does not support streaming
+        """
+        if not self._streaming:
+            return None
+        
+        chunks = queue.Queue()
+        chunks.put(head)
+        
+        self._upload_result = None
+        self._upload_thread = threading.Thread(
+            target=self._upload, args=(chunks,), daemon=True
+        )
+        self._upload_thread.start()
+        return chunks
+    
+    def _finish_upload(self, chunks):
+        """Signal the end of the audio to the upload thread"""
+        if chunks is not None:
+            chunks.put(None)
+    
+    def _upload(self, chunks: queue.Queue):
+        """Upload thread: POST chunks as they arrive (chunked transfer)"""
+        deflate = zlib.compressobj(1) if self.compress else None
+        
+        def body():
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    break
+                if self._encode:
+                    chunk = self._encode(chunk)
+                if deflate:
+                    # May buffer internally - never send an empty chunk
+                    chunk = deflate.compress(chunk)
+                    if not chunk:
+                        continue
+                yield chunk
+            if deflate:
+                yield deflate.flush()
+        
         try:
-            with wave.open(buf, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(SAMPLE_RATE)
-                wf.writeframes(b''.join(frames))
-            
-            duration = len(frames) * CHUNK_SIZE / SAMPLE_RATE
-            print(f"✅ Recorded {duration:.1f}s\n")
+            r = self.session.post(
+                f"{self.server_url}/process_stream",
+                data=body(),
+                headers=self._upload_headers,
+                timeout=30
+            )
+            if r.status_code in (404, 405):
+                # Older server without streaming: upload after recording
+                log.warning("⚠️  Server does not support streaming, uploading after recording")
+                self._streaming = False
+                return
             
-            return buf.getvalue()
+            log.debug(f"📥 Response: {r.status_code}")
+            self._upload_result = r.json()
         except Exception as e:
-            print(f"❌ WAV error: {e}")
-            if self.led:
-                self.led.set_error()
-            return None
+            log.warning(f"⚠️  Streaming upload failed: {e}")
     
-    
-    def send(self, audio: bytes) -> dict:
+    def send(self, audio: memoryview) -> dict:
         """Send audio to server - RED LED stays ON"""
-        print("📤 Sending to server...")
+        log.debug("📤 Sending to server...")
         
         # Keep RED LED on during network transfer
         if self.led:
             self.led.set_processing()
         
+        # Audio was already streamed while recording - just wait for the reply
+        if self._upload_thread:
+            self._upload_thread.join()
+            self._upload_thread = None
+            if self._upload_result is not None:
+                return self._upload_result
+        
+        # Fallback: upload the whole recording
+        if self._encode:
+            audio = self._encode(audio)
+        if self.compress:
+            audio = zlib.compress(audio, 1)
+        
         try:
-            files = {'file': ('audio.wav', audio, 'audio/wav')}
-            r = requests.post(
+            r = self.session.post(
                 f"{self.server_url}/process_audio",
-                files=files,
+                data=audio,
+                headers=self._upload_headers,
                 timeout=30
             )
             
-            print(f"📥 Response: {r.status_code}\n")
+            log.debug(f"📥 Response: {r.status_code}")
             return r.json()
         
         except requests.exceptions.Timeout:
@@ -230,29 +530,162 @@ class SmartFaceClient:
         if self.led:
             self.led.set_processing()
         
+        if not self._tts_cmd:
+            return
+        
+        # One utterance at a time
+        self._wait_tts()
+        
+        # Replay a cached rendering if we have one, else synthesize live
+        # (a repeated text is rendered for next time meanwhile)
+        cached = self._tts_cached(text)
+        if cached and self._play_wav(cached):
+            return
+        
+        # Returns immediately - record() waits for playback to finish
         try:
-            # macOS
-            subprocess.run(
-                ['say', '-r', str(TTS_RATE), text],
+            self._tts_proc = subprocess.Popen(
+                self._tts_cmd,
+                stdin=subprocess.PIPE,
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL
             )
-        except FileNotFoundError:
+            self._tts_proc.stdin.write(text.encode())
+            self._tts_proc.stdin.close()
+        except OSError:
+            self._tts_proc = None
+    
+    def _tts_cached(self, text: str):
+        """
+        Get the cached WAV for text
+        
+        On a miss, a text seen before is rendered in the background, so
+        the caller speaks it live without waiting for the synthesis.
+        
+        Args:
+            text: Text to speak
+        
+        Returns:
+            Path to the WAV file, or None if not cached (yet)
+        """
+        if not self._tts_dir:
+            return None
+        
+        # Key on the synth command too, so a rate change re-renders
+        key = '\0'.join(self._tts_synth + [text]).encode()
+        name = hashlib.blake2b(key, digest_size=8).hexdigest() + '.wav'
+        path = os.path.join(self._tts_dir, name)
+        
+        if os.path.exists(path):
+            # Touch for LRU eviction
             try:
-                # Linux/Pi
-                subprocess.run(
-                    ['espeak', '-s', str(TTS_RATE), text],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
-            except:
+                os.utime(path)
+            except OSError:
                 pass
+            return path
+        
+        # First time: just remember it (bounded, oldest forgotten first)
+        if self._tts_seen.pop(name, None) is None:
+            self._tts_seen[name] = True
+            if len(self._tts_seen) > TTS_CACHE_SIZE * 4:
+                self._tts_seen.pop(next(iter(self._tts_seen)))
+            return None
+        
+        self._tts_render.submit(self._render_tts, text, path)
+        return None
+    
+    def _render_tts(self, text: str, path: str):
+        """Synthesize text to the WAV cache (on the render thread)"""
+        if os.path.exists(path):
+            return
+        tmp = path + '.tmp'
+        try:
+            subprocess.run(
+                self._tts_synth + [tmp],
+                input=text.encode(),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True
+            )
+            os.replace(tmp, path)
+        except (OSError, subprocess.CalledProcessError):
+            return
+        
+        self._prune_tts_cache()
+    
+    def _prune_tts_cache(self):
+        """Drop least recently used WAVs beyond TTS_CACHE_SIZE"""
+        try:
+            entries = [
+                e for e in os.scandir(self._tts_dir)
+                if e.name.endswith('.wav')
+            ]
+            if len(entries) <= TTS_CACHE_SIZE:
+                return
+            entries.sort(key=lambda e: e.stat().st_mtime)
+            for e in entries[:len(entries) - TTS_CACHE_SIZE]:
+                os.unlink(e.path)
+        except OSError:
+            pass
+    
+    def _open_output(self, rate: int):
+        """(Re)open the speaker stream for 16-bit mono audio at rate"""
+        if self._out_stream is not None and self._out_rate == rate:
+            return
+        if self._out_stream is not None:
+            self._out_stream.close()
+            self._out_stream = None
+        
+        self._out_stream = self.p.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=rate,
+            output=True
+        )
+        self._out_rate = rate
+    
+    def _play_wav(self, path: str) -> bool:
+        """
+        Play a cached WAV on the speaker stream in the background
+        
+        Returns:
+            False if the file or the stream can't be used
+        """
+        try:
+            with wave.open(path, 'rb') as wf:
+                if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+                    return False
+                rate = wf.getframerate()
+                pcm = wf.readframes(wf.getnframes())
+            self._open_output(rate)
+            
+            if self._tts_gain != 1:
+                samples = np.frombuffer(pcm, dtype=np.int16) * self._tts_gain
+                pcm = np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+        except Exception as e:
+            log.warning(f"⚠️  Playback error: {e}")
+            return False
+        
+        self._play_thread = threading.Thread(
+            target=self._out_stream.write, args=(pcm,), daemon=True
+        )
+        self._play_thread.start()
+        return True
+    
+    def _wait_tts(self):
+        """Block until the current TTS utterance has finished"""
+        if self._play_thread:
+            self._play_thread.join()
+            self._play_thread = None
+        if self._tts_proc:
+            self._tts_proc.wait()
+            self._tts_proc = None
     
     def run(self):
         """Main loop"""
-        print("="*60)
+        print(_EQ)
         print("✨ Ready! Press Ctrl+C to exit")
-        print("="*60 + "\n")
+        print(_EQ + "\n")
         
         # Start in idle state (RED LED)
         if self.led:
@@ -265,9 +698,9 @@ class SmartFaceClient:
         try:
             while True:
                 count += 1
-                print(f"{'─'*60}")
+                print(_SEP)
                 print(f"Interaction #{count}")
-                print('─'*60 + "\n")
+                print(_SEP + "\n")
                 
                 # Set idle before recording (RED LED)
                 if self.led:
@@ -318,15 +751,23 @@ class SmartFaceClient:
         
         finally:
             # Cleanup
+            self._wait_tts()
+            
             if self.stream:
                 self.stream.stop_stream()
                 self.stream.close()
-            self.p.terminate()
+                self.stream = None
+            
+            if self._out_stream:
+                self._out_stream.close()
+                self._out_stream = None
             
             # Turn off LEDs
             if self.led:
                 self.led.cleanup()
             
+            self.session.close()
+            
             print("\n✅ Client closed\n")
 
 
@@ -349,9 +790,42 @@ LED Status:
         help='Server URL (e.g., http://192.168.1.72:8000)'
     )
     
+    parser.add_argument(
+        '--latency-msec',
+        type=int,
+        help='PortAudio minimum latency in ms (default: 10, raise if audio overruns)'
+    )
+    
+    parser.add_argument(
+        '--compress',
+        action='store_true',
+        help='Deflate audio uploads (for slow Wi-Fi links)'
+    )
+    
+    parser.add_argument(
+        '--codec',
+        choices=['l16', 'pcmu'],
+        default='l16',
+        help='Upload format: l16 (16-bit PCM) or pcmu (8-bit μ-law, half the size)'
+    )
+    
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Show per-chunk and network details'
+    )
+    
     args = parser.parse_args()
     
-    client = SmartFaceClient(args.server)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(message)s'
+    )
+    
+    if args.latency_msec is not None:
+        os.environ['PA_MIN_LATENCY_MSEC'] = str(args.latency_msec)
+    
+    client = SmartFaceClient(args.server, compress=args.compress, codec=args.codec)
     client.run()
 
 
@@ -5,10 +5,11 @@ Detects and configures Bluetooth speakers/microphones before SmartFace starts
 """
 
 import subprocess
-import re
 import time
 import sys
 
+from smartface.audio_utils import parse_bluetooth_nodes
+
 
 class AudioDeviceManager:
     """Manage audio device detection and configuration"""
@@ -43,25 +44,24 @@ class AudioDeviceManager:
         print("🔍 Searching for Bluetooth audio devices...")
         print("="*60 + "\n")
         
-        # Find Bluetooth sink (speakers/headphones)
-        sink_pattern = r'(\d+)\.\s+(.+bluez.+output.+)'
-        for match in re.finditer(sink_pattern, status, re.IGNORECASE):
-            self.bt_sink_id = match.group(1)
-            self.bt_sink_name = match.group(2).strip()
+        # Find Bluetooth sink (speakers/headphones) and source (microphone)
+        devices = parse_bluetooth_nodes(status)
+        if devices['sink_id'] is not None:
+            self.bt_sink_id = str(devices['sink_id'])
+            self.bt_sink_name = devices['sink_name']
+        if devices['source_id'] is not None:
+            self.bt_source_id = str(devices['source_id'])
+            self.bt_source_name = devices['source_name']
+        
+        if self.bt_sink_id:
             print(f"✅ Bluetooth Speaker found:")
             print(f"   ID: {self.bt_sink_id}")
             print(f"   Name: {self.bt_sink_name}\n")
-            break
         
-        # Find Bluetooth source (microphone)
-        source_pattern = r'(\d+)\.\s+(.+bluez.+input.+)'
-        for match in re.finditer(source_pattern, status, re.IGNORECASE):
-            self.bt_source_id = match.group(1)
-            self.bt_source_name = match.group(2).strip()
+        if self.bt_source_id:
             print(f"✅ Bluetooth Microphone found:")
             print(f"   ID: {self.bt_source_id}")
             print(f"   Name: {self.bt_source_name}\n")
-            break
         
         if not self.bt_sink_id and not self.bt_source_id:
             print("❌ No Bluetooth audio devices found!")
@@ -4,20 +4,59 @@ SmartFace FastAPI Server
 Ultra-simple API server for voice processing
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import uvicorn
-import wave
 import json
-import tempfile
+import mmap
 import os
+import zlib
+import queue
+import asyncio
+from contextlib import contextmanager
 
 # Vosk
 from vosk import Model, KaldiRecognizer
 
+# Faster event loop / HTTP parser (both come with uvicorn[standard])
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+try:
+    import httptools
+    HTTPTOOLS_AVAILABLE = True
+except ImportError:
+    HTTPTOOLS_AVAILABLE = False
+
+# Faster JSON decoding of Vosk results
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Responses are serialized with orjson too when available
+ResponseClass = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
 # SmartFace components - IMPORTS CORRIGÉS! ✅
-from smartface.config import VOSK_MODEL_PATH, SERVER_HOST, SERVER_PORT
+from smartface.config import (
+    VOSK_MODEL_PATH,
+    SERVER_HOST,
+    SERVER_PORT,
+    SAMPLE_RATE,
+    RECOGNIZER_POOL_SIZE,
+    INTENT_BATCH_SIZE,
+    INTENT_BATCH_TIMEOUT_MS,
+    LISTEN_TIMEOUT
+)
+from smartface.codec import mulaw_decode, parse_pcm_rate, parse_wav, validate_rate
 from smartface.nlp import NLPProcessor
 from smartface.response_handler import ResponseHandler
 from smartface.skills.web_search import WebSearchSkill
@@ -40,7 +79,8 @@ except:
 app = FastAPI(
     title="SmartFace API",
     description="Simple voice assistant API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ResponseClass
 )
 
 print("\n🚀 Loading SmartFace components...")
@@ -48,6 +88,17 @@ print("\n🚀 Loading SmartFace components...")
 # Load Vosk
 print(f"📦 Loading Vosk model: {VOSK_MODEL_PATH}")
 vosk_model = Model(VOSK_MODEL_PATH)
+
+def new_recognizer(rate: int) -> KaldiRecognizer:
+    """Create a recognizer that returns text only (no per-word JSON)"""
+    rec = KaldiRecognizer(vosk_model, rate)
+    rec.SetWords(False)
+    return rec
+
+# Recognizers are reused between requests (Reset() on release)
+recognizer_pool = queue.Queue(maxsize=RECOGNIZER_POOL_SIZE)
+for _ in range(RECOGNIZER_POOL_SIZE):
+    recognizer_pool.put(new_recognizer(SAMPLE_RATE))
 print("✅ Vosk ready")
 
 # Load NLP
@@ -89,41 +140,167 @@ def health():
     return {"status": "healthy"}
 
 @app.post("/process_audio")
-async def process_audio(file: UploadFile = File(...)):
+async def process_audio(request: Request, file: UploadFile = File(None)):
     """
-    Process audio file (WAV)
-    Upload WAV file, get transcription + response
+    Process audio file (WAV upload) or raw body (audio/L16 or audio/PCMU)
+    Get transcription + response
     """
     try:
-        # Save uploaded file
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
+        if file is None:
+            # Raw PCM body: inflate, decode and recognize off the event loop
+            try:
+                rate = validate_rate(parse_pcm_rate(request.headers.get('content-type', '')))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            body = await request.body()
+            text = await run_in_threadpool(
+                recognize_body, body, rate, is_deflated(request), is_mulaw(request)
+            )
+        else:
+            # Decode the uploaded WAV in memory
             content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
+            text = await run_in_threadpool(recognize_speech, content)
         
-        try:
-            # Recognize speech
-            text = recognize_speech(tmp_path)
-            
-            if not text:
-                return JSONResponse({
-                    "error": "No speech detected",
-                    "response": "I didn't catch that."
-                }, status_code=400)
-            
-            # Process query
-            result = process_query(text)
-            return result
+        if not text:
+            return ResponseClass({
+                "error": "No speech detected",
+                "response": "I didn't catch that."
+            }, status_code=400)
+        
+        # Process query
+        result = await answer_query(text)
+        return result
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/process_stream")
+async def process_stream(request: Request):
+    """
+    Process streamed raw audio (audio/L16 16-bit PCM or audio/PCMU μ-law, mono)
+    Speech is recognized while the client is still uploading
+    """
+    try:
+        rate = validate_rate(parse_pcm_rate(request.headers.get('content-type', '')))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        mulaw = is_mulaw(request)
+        
+        # Optional deflate compression from the client (--compress)
+        inflate = None
+        if is_deflated(request):
+            inflate = zlib.decompressobj()
+        
+        with pooled_recognizer(rate) as rec:
+            text = ""
+            pending = b""
+            async for chunk in request.stream():
+                if inflate:
+                    chunk = inflate.decompress(chunk)
+                if mulaw:
+                    chunk = mulaw_decode(chunk)
+                
+                # Only feed whole 16-bit samples
+                if pending:
+                    chunk = pending + chunk
+                usable = len(chunk) & ~1
+                pending = chunk[usable:]
+                
+                # Decode off the event loop
+                if usable:
+                    segment, _ = await run_in_threadpool(accept_pcm, rec, chunk[:usable])
+                    if segment is not None:
+                        text += segment + " "
             
-        finally:
-            os.unlink(tmp_path)
+            final = await run_in_threadpool(final_text, rec)
+            text = (text + final).strip()
+        
+        if not text:
+            return ResponseClass({
+                "error": "No speech detected",
+                "response": "I didn't catch that."
+            }, status_code=400)
+        
+        return await answer_query(text)
     
     except Exception as e:
         print(f"❌ Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.websocket("/stream")
+async def stream(websocket: WebSocket):
+    """
+    Persistent audio stream for many utterances
+    Client sends binary L16 PCM frames (rate from ?rate=, default 16000),
+    then the text message "end" after each utterance.
+    Server sends {"partial": ...} while audio arrives and the query result
+    after "end".
+    """
+    await websocket.accept()
+    try:
+        rate = validate_rate(websocket.query_params.get('rate', SAMPLE_RATE))
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    
+    with pooled_recognizer(rate) as rec:
+        text = ""
+        pending = b""
+        last_partial = ""
+        try:
+            while True:
+                message = await websocket.receive()
+                if message['type'] == 'websocket.disconnect':
+                    break
+                
+                chunk = message.get('bytes')
+                if chunk is not None:
+                    # Only feed whole 16-bit samples
+                    if pending:
+                        chunk = pending + chunk
+                    usable = len(chunk) & ~1
+                    pending = chunk[usable:]
+                    if not usable:
+                        continue
+                    
+                    # Decode off the event loop
+                    segment, partial = await run_in_threadpool(
+                        accept_pcm, rec, chunk[:usable], True
+                    )
+                    if segment is not None:
+                        text += segment + " "
+                    elif partial and partial != last_partial:
+                        last_partial = partial
+                        await websocket.send_json({"partial": partial})
+                
+                elif message.get('text') == 'end':
+                    final = await run_in_threadpool(final_text, rec)
+                    text = (text + final).strip()
+                    
+                    if text:
+                        await websocket.send_json(await answer_query(text))
+                    else:
+                        await websocket.send_json({
+                            "error": "No speech detected",
+                            "response": "I didn't catch that."
+                        })
+                    
+                    # Ready for the next utterance on the same connection
+                    rec.Reset()
+                    text = ""
+                    pending = b""
+                    last_partial = ""
+        
+        except WebSocketDisconnect:
+            pass
+
 @app.post("/process_text")
-def process_text(request: TextRequest):
+async def process_text(request: TextRequest):
     """
     Process text query directly
     Send text, get intent + response
@@ -134,9 +311,13 @@ def process_text(request: TextRequest):
         if not text:
             raise HTTPException(status_code=400, detail="Empty text")
         
-        result = process_query(text)
+        # Concurrent queries share one embedding pass
+        intent = await intent_batcher.classify(text.lower())
+        result = await answer_query(text, intent)
         return result
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -145,39 +326,220 @@ def process_text(request: TextRequest):
 # HELPERS
 # ============================================================================
 
-def recognize_speech(wav_path: str) -> str:
-    """Recognize speech from WAV file"""
+@contextmanager
+def pooled_recognizer(rate: int):
+    """
+    Borrow a recognizer from the pool
+    
+    Falls back to a fresh recognizer when the pool is empty (concurrent
+    requests) or for a non-default sample rate.
+    """
+    rec = None
+    if rate == SAMPLE_RATE:
+        try:
+            rec = recognizer_pool.get_nowait()
+        except queue.Empty:
+            pass
+    if rec is None:
+        rec = new_recognizer(rate)
+    
     try:
-        wf = wave.open(wav_path, "rb")
-        rec = KaldiRecognizer(vosk_model, wf.getframerate())
-        
-        text = ""
-        while True:
-            data = wf.readframes(4000)
-            if len(data) == 0:
-                break
-            if rec.AcceptWaveform(data):
-                result = json.loads(rec.Result())
-                text += result.get('text', '') + " "
-        
-        final = json.loads(rec.FinalResult())
-        text += final.get('text', '')
+        yield rec
+    finally:
+        if rate == SAMPLE_RATE:
+            rec.Reset()
+            try:
+                recognizer_pool.put_nowait(rec)
+            except queue.Full:
+                pass
+
+def accept_pcm(rec, pcm, partial: bool = False) -> tuple:
+    """
+    Feed 16-bit PCM to a recognizer (blocking: run it in the threadpool)
+    
+    Returns:
+        tuple: (text, None) when a segment is complete, else
+        (None, partial text if requested)
+    """
+    if rec.AcceptWaveform(pcm):
+        return json_loads(rec.Result()).get('text', ''), None
+    if partial:
+        return None, json_loads(rec.PartialResult()).get('partial', '')
+    return None, None
+
+def final_text(rec) -> str:
+    """Flush a recognizer and return the last segment (blocking)"""
+    return json_loads(rec.FinalResult()).get('text', '')
+
+def recognize_speech(wav_file) -> str:
+    """Recognize speech from a WAV file (path, file object or bytes)"""
+    try:
+        if isinstance(wav_file, (str, os.PathLike)):
+            # Map the file instead of reading it chunk by chunk
+            with open(wav_file, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                rate, pcm = parse_wav(mm)
+                with pcm:
+                    return recognize_pcm(pcm, rate)
         
-        wf.close()
+        if hasattr(wav_file, 'read'):
+            wav_file = wav_file.read()
+        rate, pcm = parse_wav(wav_file)
+        return recognize_pcm(pcm, rate)
+    
+    except Exception as e:
+        print(f"❌ Recognition error: {e}")
+        return ""
+
+def recognize_pcm(pcm, rate: int) -> str:
+    """Recognize speech from raw 16-bit mono PCM (bytes-like)"""
+    try:
+        with pooled_recognizer(rate) as rec, memoryview(pcm) as view:
+            parts = []
+            step = 32000  # 16000 frames (1 s at 16 kHz)
+            for i in range(0, len(view), step):
+                # Vosk only accepts bytes: one copy per block
+                if rec.AcceptWaveform(bytes(view[i:i + step])):
+                    parts.append(json_loads(rec.Result()).get('text', ''))
+            
+            parts.append(json_loads(rec.FinalResult()).get('text', ''))
         
-        return text.strip()
+        return ' '.join(filter(None, parts))
     
     except Exception as e:
         print(f"❌ Recognition error: {e}")
         return ""
 
-def process_query(text: str) -> dict:
-    """Process query and return response"""
+def recognize_body(body: bytes, rate: int, deflated: bool, mulaw: bool) -> str:
+    """Recognize a raw request body (optionally deflated and/or μ-law)"""
+    if deflated:
+        body = zlib.decompress(body)
+    if mulaw:
+        body = mulaw_decode(body)
+    return recognize_pcm(body, rate)
+
+def is_deflated(request: Request) -> bool:
+    """Check whether the request body is deflate (zlib) compressed"""
+    return request.headers.get('content-encoding', '').lower() == 'deflate'
+
+def is_mulaw(request: Request) -> bool:
+    """Check whether the request body is μ-law (audio/PCMU)"""
+    return request.headers.get('content-type', '').lower().startswith('audio/pcmu')
+
+def resolve_intents(normalized_texts: list) -> list:
+    """Classify lowercased, stripped texts (NLPProcessor caches results)"""
+    return nlp.classify_intent_batch(normalized_texts)
+
+class IntentBatcher:
+    """
+    Coalesce concurrent intent lookups into one resolve_intents() call
+    
+    The first request of a batch waits at most timeout_ms for others.
+    """
+    
+    def __init__(self, batch_size=16, timeout_ms=10):
+        self.batch_size = batch_size
+        self.timeout = timeout_ms / 1000
+        self._queue = None
+        self._task = None
+    
+    async def classify(self, normalized_text: str) -> tuple:
+        """Classify one text, batched with concurrent callers"""
+        if self._queue is None:
+            # Bound to the running event loop on first use
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._worker())
+            self._task.add_done_callback(self._worker_done)
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((normalized_text, future))
+        return await future
+    
+    async def close(self):
+        """Stop the worker task (server shutdown)"""
+        task, self._task = self._task, None
+        self._queue = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
+    @staticmethod
+    def _worker_done(task):
+        """Report a worker that died instead of losing its exception"""
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Intent batcher stopped: {task.exception()!r}")
+    
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.timeout
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                results = await run_in_threadpool(resolve_intents, [t for t, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+intent_batcher = IntentBatcher(INTENT_BATCH_SIZE, INTENT_BATCH_TIMEOUT_MS)
+
+@app.on_event("shutdown")
+async def stop_intent_batcher():
+    await intent_batcher.close()
+
+async def answer_query(text: str, classified: tuple = None) -> dict:
+    """
+    Run process_query in the threadpool so skill HTTP calls (weather,
+    web search) don't block the event loop; give up after LISTEN_TIMEOUT
+    """
+    try:
+        return await asyncio.wait_for(
+            run_in_threadpool(process_query, text, classified),
+            timeout=LISTEN_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        print(f"⚠️  Query timed out after {LISTEN_TIMEOUT}s: {text}")
+        return {
+            "text": text,
+            "intent": "unknown",
+            "confidence": 0.0,
+            "entities": {},
+            "response": "Sorry, that took too long. Please try again."
+        }
+
+def process_query(text: str, classified: tuple = None) -> dict:
+    """
+    Process query and return response
+    
+    Args:
+        text: Transcribed or typed query
+        classified: (intent, confidence) if already classified
+    """
     print(f"📝 Query: {text}")
     
-    # NLP
-    intent, confidence = nlp.classify_intent(text)
-    entities = nlp.extract_entities(text, intent)
+    # NLP (intent and entities are memoized, skill responses are not)
+    if classified is None:
+        intent, confidence, entities = nlp.understand(text)
+    else:
+        intent, confidence = classified
+        entities = nlp.extract_entities(text, intent)
     
     print(f"💡 Intent: {intent} ({confidence:.2f})")
     
@@ -192,53 +554,73 @@ def process_query(text: str) -> dict:
         "response": response_text
     }
 
-def generate_response(intent: str, entities: dict, text: str) -> str:
-    """Generate response based on intent"""
-    
+def _respond_simple(intent, entities, text):
+    return response_handler.generate_response(intent, entities)
+
+def _respond_search(intent, entities, text):
+    query = entities.get('query', text)
+    result = web_search.search(query)
+    # Truncate if too long
+    if len(result) > 300:
+        parts = result.split('\n\n')
+        return parts[0] if parts else result[:300]
+    return result
+
+def _respond_reminder_set(intent, entities, text):
+    reminder = entities.get('reminder_text', '')
+    return reminders.add_reminder(reminder) if reminder else "What should I remind you about?"
+
+def _respond_reminder_list(intent, entities, text):
+    return reminders.list_reminders()
+
+def _respond_light_on(intent, entities, text):
+    return smart_home.turn_on_light(entities.get('room'))
+
+def _respond_light_off(intent, entities, text):
+    return smart_home.turn_off_light(entities.get('room'))
+
+def _respond_temperature_set(intent, entities, text):
+    temp = entities.get('number')
+    return smart_home.set_temperature(temp) if temp else "What temperature?"
+
+def _respond_device_status(intent, entities, text):
+    return smart_home.get_status()
+
+def _respond_weather(intent, entities, text):
+    return weather.handle(intent, entities, text)
+
+def _respond_unknown(intent, entities, text):
+    return response_handler.generate_response('unknown')
+
+# Intent -> handler(intent, entities, text)
+_DISPATCH = {
     # Simple intents
-    if intent in ['greet', 'goodbye', 'how_are_you', 'thank', 
-                  'name', 'help', 'joke', 'time', 'date']:
-        return response_handler.generate_response(intent, entities)
-    
+    **dict.fromkeys(['greet', 'goodbye', 'how_are_you', 'thank',
+                     'name', 'help', 'joke', 'time', 'date'], _respond_simple),
     # Web search
-    elif intent == 'web_search' or entities.get('likely_search'):
-        query = entities.get('query', text)
-        result = web_search.search(query)
-        # Truncate if too long
-        if len(result) > 300:
-            parts = result.split('\n\n')
-            return parts[0] if parts else result[:300]
-        return result
-    
+    'web_search': _respond_search,
     # Reminders
-    elif intent == 'reminder_set':
-        reminder = entities.get('reminder_text', '')
-        return reminders.add_reminder(reminder) if reminder else "What should I remind you about?"
-    
-    elif intent == 'reminder_list':
-        return reminders.list_reminders()
-    
+    'reminder_set': _respond_reminder_set,
+    'reminder_list': _respond_reminder_list,
     # Smart home
-    elif intent == 'light_on':
-        return smart_home.turn_on_light(entities.get('room'))
-    
-    elif intent == 'light_off':
-        return smart_home.turn_off_light(entities.get('room'))
-    
-    elif intent == 'temperature_set':
-        temp = entities.get('number')
-        return smart_home.set_temperature(temp) if temp else "What temperature?"
-    
-    elif intent == 'device_status':
-        return smart_home.get_status()
-    
+    'light_on': _respond_light_on,
+    'light_off': _respond_light_off,
+    'temperature_set': _respond_temperature_set,
+    'device_status': _respond_device_status,
     # Weather
-    elif intent in ['weather', 'weather_city']:
-        return weather.handle(intent, entities, text)
+    'weather': _respond_weather,
+    'weather_city': _respond_weather,
+}
+
+def generate_response(intent: str, entities: dict, text: str) -> str:
+    """Generate response based on intent"""
+    # Unknown intents that look like questions go to web search
+    # (extract_entities only sets likely_search for 'unknown')
+    if entities.get('likely_search') and intent not in _DISPATCH:
+        return _respond_search(intent, entities, text)
     
-    # Unknown
-    else:
-        return response_handler.generate_response('unknown')
+    handler = _DISPATCH.get(intent, _respond_unknown)
+    return handler(intent, entities, text)
 
 # ============================================================================
 # MAIN
@@ -255,17 +637,24 @@ if __name__ == "__main__":
 ║  Endpoints:                                              ║
 ║    GET  /          - Root                                ║
 ║    GET  /health    - Health check                        ║
-║    POST /process_audio - Upload WAV file                 ║
+║    POST /process_audio - Upload WAV file / raw PCM       ║
+║    POST /process_stream - Stream raw PCM (L16)           ║
 ║    POST /process_text  - Send text query                 ║
+║    WS   /stream        - Persistent audio stream         ║
 ║                                                          ║
 ║  Docs: http://localhost:{SERVER_PORT}/docs                       ║
 ║                                                          ║
 ╚══════════════════════════════════════════════════════════╝
     """)
     
+    if not UVLOOP_AVAILABLE:
+        print("⚠️  uvloop not installed - using the default asyncio loop")
+    
     uvicorn.run(
         app,
         host=SERVER_HOST,
         port=SERVER_PORT,
+        loop="uvloop" if UVLOOP_AVAILABLE else "asyncio",
+        http="httptools" if HTTPTOOLS_AVAILABLE else "h11",
         log_level="info"
     )
\ No newline at end of file
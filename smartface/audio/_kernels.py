@@ -0,0 +1,185 @@
+"""
+Fused preprocessing kernels for AudioPreprocessor
+Compiled with numba when available, NumPy fallback otherwise
+
+The numba kernels are compiled eagerly for the signatures they are
+used with (16-bit mono in, writable or read-only, float32 out) and cached on disk, so only the
+very first run pays for compilation, at import rather than on the first
+utterance. The tuning constants below are globals, which numba freezes
+into the machine code.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, types
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Noise gate: samples below GATE_FACTOR x the 10th percentile magnitude
+# are attenuated by GATE_GAIN
+GATE_PERCENTILE = 10
+GATE_FACTOR = 2.0
+GATE_GAIN = 0.1
+
+# Pre-emphasis coefficient
+PRE_EMPHASIS = 0.97
+
+# One histogram bin per integer magnitude (int16 audio minus its mean)
+_HIST_BINS = 65536
+
+
+def _preprocess_numpy(x):
+    """NumPy version of preprocess_kernel (same stages, several passes)"""
+    x = np.asarray(x, dtype=np.float32)
+    out = np.zeros(x.size, dtype=np.float32)
+    amax = np.max(np.abs(x)) if x.size else 0
+    if amax == 0:
+        return out
+
+    # Remove DC offset
+    d = x - x.mean()
+    magnitude = np.abs(d)
+
+    # Noise gate percentile from a histogram of |d| (O(n), no sort),
+    # same one-LSB bins as the numba kernel
+    counts = np.bincount(np.rint(magnitude).astype(np.int64), minlength=1)
+    rank = int(GATE_PERCENTILE / 100 * (x.size - 1))
+    noise_floor = np.searchsorted(np.cumsum(counts), rank, side='right')
+    threshold = noise_floor * GATE_FACTOR
+
+    # Normalize + noise gate
+    y = d * (32767 / amax)
+    y[magnitude < threshold] *= GATE_GAIN
+
+    # Pre-emphasis
+    out[0] = y[0]
+    np.subtract(y[1:], PRE_EMPHASIS * y[:-1], out=out[1:])
+    return out
+
+
+if NUMBA_AVAILABLE:
+    # int16 audio: contiguous or strided, and read-only contiguous
+    # (np.frombuffer over bytes). Each argument matches one exactly
+    _INT16_IN = (types.int16[::1], types.int16[:],
+                 types.Array(types.int16, 1, 'C', readonly=True))
+
+    @njit([types.float32[::1](x) for x in _INT16_IN], cache=True, fastmath=True)
+    def preprocess_kernel(x):
+        """
+        Normalize, remove DC offset, noise gate and pre-emphasis in one kernel
+
+        Args:
+            x: int16 audio
+
+        Returns:
+            float32 audio (band-pass filtering happens afterwards)
+        """
+        n = x.size
+        out = np.zeros(n, dtype=np.float32)
+
+        # Pass 1: peak and mean
+        amax = 0
+        total = 0.0
+        for i in range(n):
+            v = abs(np.int32(x[i]))
+            if v > amax:
+                amax = v
+            total += x[i]
+        if amax == 0:
+            return out
+        mean = total / n
+        scale = 32767.0 / amax
+
+        # Pass 2: histogram of |x - mean| for the gate percentile (no sort)
+        hist = np.zeros(_HIST_BINS, dtype=np.int64)
+        for i in range(n):
+            b = int(abs(x[i] - mean) + 0.5)
+            hist[min(b, _HIST_BINS - 1)] += 1
+
+        rank = int(GATE_PERCENTILE / 100 * (n - 1))
+        seen = 0
+        noise_floor = 0
+        for b in range(_HIST_BINS):
+            seen += hist[b]
+            if seen > rank:
+                noise_floor = b
+                break
+        threshold = noise_floor * GATE_FACTOR
+
+        # Pass 3: normalize, gate and pre-emphasis fused
+        prev = 0.0
+        for i in range(n):
+            d = x[i] - mean
+            y = d * scale
+            if abs(d) < threshold:
+                y *= GATE_GAIN
+            out[i] = y - PRE_EMPHASIS * prev
+            prev = y
+        return out
+else:
+    preprocess_kernel = _preprocess_numpy
+
+
+def sos_padlen(sos):
+    """Default odd-extension pad length of scipy.signal.sosfiltfilt"""
+    ntaps = 2 * len(sos) + 1
+    ntaps -= min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+    return 3 * ntaps
+
+
+if NUMBA_AVAILABLE:
+    @njit('void(float64[:, :], float64[:, :], float32[:], int64, int64, int64)', cache=True)
+    def _sosfilt_inplace(sos, zi, y, start, stop, step):
+        """Run the biquad cascade over y[start:stop:step] in place"""
+        n_sections = sos.shape[0]
+        x0 = y[start]
+        z = np.empty((n_sections, 2))
+        for s in range(n_sections):
+            z[s, 0] = zi[s, 0] * x0
+            z[s, 1] = zi[s, 1] * x0
+        for i in range(start, stop, step):
+            v = np.float64(y[i])
+            for s in range(n_sections):
+                out = sos[s, 0] * v + z[s, 0]
+                z[s, 0] = sos[s, 1] * v - sos[s, 4] * out + z[s, 1]
+                z[s, 1] = sos[s, 2] * v - sos[s, 5] * out
+                v = out
+            y[i] = v
+
+    @njit('float32[::1](float64[:, :], float64[:, :], float32[:], int64)', cache=True)
+    def sosfiltfilt_kernel(sos, zi, x, padlen):
+        """
+        Zero-phase biquad cascade, same result as scipy.signal.sosfiltfilt
+
+        Args:
+            sos: Second-order sections (n_sections, 6), a0 == 1
+            zi: Steady-state initial conditions from scipy.signal.sosfilt_zi
+            x: float32 audio
+            padlen: Odd-extension length at each end
+
+        Returns:
+            float32 filtered audio
+        """
+        n = x.size
+        padlen = min(padlen, n - 1)
+        m = n + 2 * padlen
+        ext = np.empty(m, dtype=np.float32)
+
+        # Odd extension: reflect about the end samples
+        for i in range(padlen):
+            ext[i] = 2 * x[0] - x[padlen - i]
+            ext[m - 1 - i] = 2 * x[n - 1] - x[n - 1 - padlen + i]
+        ext[padlen:padlen + n] = x
+
+        # Forward pass, then backward pass on the reversed output
+        _sosfilt_inplace(sos, zi, ext, 0, m, 1)
+        _sosfilt_inplace(sos, zi, ext, m - 1, -1, -1)
+
+        return ext[padlen:padlen + n].copy()
+else:
+    def sosfiltfilt_kernel(sos, zi, x, padlen):
+        """scipy fallback for sosfiltfilt_kernel (zi is recomputed by scipy)"""
+        from scipy.signal import sosfiltfilt
+        return sosfiltfilt(sos, x, padlen=min(padlen, x.size - 1)).astype(np.float32)
@@ -1,15 +1,72 @@
+import atexit
+import os
+import pickle
+
 import numpy as np
 import scipy.signal as signal
 from scipy.io import wavfile
 
+from smartface.audio._kernels import preprocess_kernel, sosfiltfilt_kernel, sos_padlen
+from smartface.config import FFTW_WISDOM_FILE
+
+try:
+    import pyfftw
+    import pyfftw.interfaces.scipy_fft as fft
+    PYFFTW_AVAILABLE = True
+except ImportError:
+    from scipy import fft
+    PYFFTW_AVAILABLE = False
+
+
+def _load_fftw_wisdom():
+    """Reuse FFTW plans measured by earlier runs"""
+    try:
+        with open(FFTW_WISDOM_FILE, 'rb') as f:
+            pyfftw.import_wisdom(pickle.load(f))
+    except (OSError, pickle.PickleError, EOFError, ValueError):
+        pass
+
+
+def _save_fftw_wisdom():
+    """Persist FFTW plans for the next run"""
+    try:
+        os.makedirs(os.path.dirname(FFTW_WISDOM_FILE), exist_ok=True)
+        with open(FFTW_WISDOM_FILE, 'wb') as f:
+            pickle.dump(pyfftw.export_wisdom(), f)
+    except OSError:
+        pass
+
+
+if PYFFTW_AVAILABLE:
+    # Plans are measured once per block shape (see FFT_BLOCK), then reused
+    # from the cache
+    pyfftw.config.PLANNER_EFFORT = 'FFTW_MEASURE'
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(60)
+    _load_fftw_wisdom()
+    atexit.register(_save_fftw_wisdom)
+
 
 class AudioPreprocessor:
     """
     Audio preprocessing to improve Vosk recognition
     """
     
+    # STFT frames per FFT call: every call has the same shape, so FFTW
+    # plans once instead of once per utterance length
+    FFT_BLOCK = 64
+    
     def __init__(self, sample_rate=16000):
         self.sample_rate = sample_rate
+        
+        # Band-pass design is constant: build it once
+        self._sos, self._zi, self._padlen = self._design_bandpass(300, 3400)
+        
+        # STFT for enhance_speech, as scipy.signal.stft's defaults:
+        # 256-sample periodic Hann window, 50% overlap
+        self._nperseg = 256
+        self._hop = 128
+        self._hann = signal.windows.hann(self._nperseg, sym=False).astype(np.float32)
     
     def preprocess(self, audio_data):
         """
@@ -25,88 +82,113 @@ class AudioPreprocessor:
         if isinstance(audio_data, bytes):
             audio_array = np.frombuffer(audio_data, dtype=np.int16)
         else:
-            audio_array = audio_data
+            audio_array = np.asarray(audio_data, dtype=np.int16)
         
-        # 1. Normalize volume
-        audio_array = self._normalize(audio_array)
+        # 1-4. Normalize volume, remove DC offset, noise gate and
+        # pre-emphasis (boost high frequencies) in one fused kernel.
+        # Pre-emphasis runs before the band-pass here: both are linear
+        # filters, so the order doesn't change the result.
+        audio_array = preprocess_kernel(audio_array)
         
-        # 2. Remove DC offset
-        audio_array = self._remove_dc_offset(audio_array)
-        
-        # 3. Apply noise reduction
-        audio_array = self._reduce_noise(audio_array)
-        
-        # 4. Apply band-pass filter (human voice: 300-3400 Hz)
+        # 5. Apply band-pass filter (human voice: 300-3400 Hz)
         audio_array = self._bandpass_filter(audio_array)
         
-        # 5. Apply pre-emphasis (boost high frequencies)
-        audio_array = self._pre_emphasis(audio_array)
-        
         return audio_array
     
-    def _normalize(self, audio):
-        """Normalize audio volume"""
-        max_val = np.max(np.abs(audio))
-        if max_val > 0:
-            audio = audio.astype(np.float32) / max_val * 32767
-        return audio.astype(np.int16)
-    
-    def _remove_dc_offset(self, audio):
-        """Remove DC offset (mean)"""
-        return audio - np.mean(audio)
-    
-    def _reduce_noise(self, audio):
-        """Simple noise gate"""
-        # Calculate noise floor
-        noise_floor = np.percentile(np.abs(audio), 10)
-        threshold = noise_floor * 2
-        
-        # Apply noise gate
-        audio_float = audio.astype(np.float32)
-        audio_float[np.abs(audio_float) < threshold] *= 0.1
-        
-        return audio_float.astype(np.int16)
+    def _design_bandpass(self, lowcut, highcut):
+        """Butterworth band-pass as second-order sections + filtfilt state"""
+        nyquist = self.sample_rate / 2
+        sos = signal.butter(4, [lowcut / nyquist, highcut / nyquist],
+                            btype='band', output='sos')
+        return sos, signal.sosfilt_zi(sos), sos_padlen(sos)
     
     def _bandpass_filter(self, audio, lowcut=300, highcut=3400):
         """Apply bandpass filter for human voice"""
-        nyquist = self.sample_rate / 2
-        low = lowcut / nyquist
-        high = highcut / nyquist
+        if (lowcut, highcut) == (300, 3400):
+            sos, zi, padlen = self._sos, self._zi, self._padlen
+        else:
+            sos, zi, padlen = self._design_bandpass(lowcut, highcut)
         
-        b, a = signal.butter(4, [low, high], btype='band')
-        filtered = signal.filtfilt(b, a, audio)
+        audio = np.asarray(audio, dtype=np.float32)
+        filtered = sosfiltfilt_kernel(sos, zi, audio, padlen)
         
         return filtered.astype(np.int16)
     
-    def _pre_emphasis(self, audio, alpha=0.97):
-        """Apply pre-emphasis filter"""
-        emphasized = np.append(audio[0], audio[1:] - alpha * audio[:-1])
-        return emphasized.astype(np.int16)
-    
     def enhance_speech(self, audio):
         """
         Enhance speech clarity using spectral subtraction
         More advanced noise reduction
         """
-        # Convert to float
-        audio_float = audio.astype(np.float32)
-        
-        # Compute spectrogram
-        f, t, Zxx = signal.stft(audio_float, fs=self.sample_rate)
-        
-        # Estimate noise (first 0.5 seconds)
-        noise_frames = int(0.5 * len(t))
-        noise_spectrum = np.mean(np.abs(Zxx[:, :noise_frames]), axis=1, keepdims=True)
-        
-        # Subtract noise
-        magnitude = np.abs(Zxx)
-        phase = np.angle(Zxx)
-        
-        # Spectral subtraction
-        clean_magnitude = np.maximum(magnitude - 2 * noise_spectrum, 0.1 * magnitude)
+        nperseg, hop = self._nperseg, self._hop
+        overlap = nperseg // hop
+        n = len(audio)
+        
+        # Zero-pad half a window at each end, and up to a whole hop
+        pad = nperseg // 2
+        n_frames = -(-(n + 2 * pad - nperseg) // hop) + 1
+        padded = np.zeros((n_frames - 1) * hop + nperseg, dtype=np.float32)
+        padded[pad:pad + n] = audio
+        
+        # Windowed frames -> one-sided spectrum
+        frames = np.lib.stride_tricks.sliding_window_view(padded, nperseg)[::hop]
+        spectrum = self._blocked(fft.rfft, frames * self._hann, nperseg // 2 + 1, np.complex64)
+        
+        # Estimate noise (first half of the frames)
+        noise_frames = max(1, int(0.5 * n_frames))
+        magnitude = np.abs(spectrum)
+        noise_spectrum = magnitude[:noise_frames].mean(axis=0)
+        
+        # Spectral subtraction as a real gain, keeps the phase:
+        # max(|X| - 2N, 0.1|X|) / |X|
+        np.maximum(magnitude, 1e-12, out=magnitude)
+        np.divide(noise_spectrum, magnitude, out=magnitude)
+        np.multiply(magnitude, -2, out=magnitude)
+        np.add(magnitude, 1, out=magnitude)
+        np.maximum(magnitude, 0.1, out=magnitude)
+        spectrum *= magnitude
+        
+        # Reconstruct: windowed overlap-add, normalized by the summed window²
+        frames = self._blocked(lambda x, **kw: fft.irfft(x, n=nperseg, **kw),
+                               spectrum, nperseg, np.float32)
+        frames *= self._hann
+        frames = frames.reshape(n_frames, overlap, hop)
+        
+        out = np.zeros((n_frames + overlap - 1, hop), dtype=np.float32)
+        norm = np.zeros_like(out)
+        window_sq = (self._hann ** 2).reshape(overlap, hop)
+        for k in range(overlap):
+            out[k:k + n_frames] += frames[:, k]
+            norm[k:k + n_frames] += window_sq[k]
+        
+        # Same length as scipy.signal.istft: the padded frames minus the
+        # boundary padding
+        length = (n_frames - 1) * hop
+        out = out.ravel()[pad:pad + length]
+        norm = norm.ravel()[pad:pad + length]
+        enhanced = np.divide(out, norm, out=out, where=norm > 1e-10)
+        
+        return enhanced.astype(np.int16)
+    
+    def _blocked(self, transform, rows, width, dtype):
+        """
+        Apply an FFT along the last axis, FFT_BLOCK rows per call
         
-        # Reconstruct
-        clean_spectrum = clean_magnitude * np.exp(1j * phase)
-        _, enhanced = signal.istft(clean_spectrum, fs=self.sample_rate)
+        The last block is zero-padded to full size, so every call has the
+        same shape (one FFTW plan per transform).
         
-        return enhanced.astype(np.int16)
\ No newline at end of file
+        Args:
+            transform: fft.rfft or an irfft wrapper
+            rows: (n, m) input
+            width: Output length along the last axis
+            dtype: Output dtype
+        """
+        block = self.FFT_BLOCK
+        n = len(rows)
+        out = np.empty((n, width), dtype=dtype)
+        buf = np.zeros((block, rows.shape[1]), dtype=rows.dtype)
+        for start in range(0, n, block):
+            count = min(block, n - start)
+            buf[:count] = rows[start:start + count]
+            buf[count:] = 0
+            out[start:start + count] = transform(buf, axis=-1, workers=-1)[:count]
+        return out
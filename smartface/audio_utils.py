@@ -6,6 +6,46 @@ Helper functions to configure audio devices
 
 import subprocess
 import re
+import time
+
+# Discovery results are reused for this long (seconds)
+_CACHE_TTL = 300
+_cache = {'config': None, 'mtime': 0}
+
+# Bluetooth nodes in `wpctl status` output
+_SINK_RE = re.compile(r'(\d+)\.\s+(.+bluez.+output.+)', re.IGNORECASE)
+_SOURCE_RE = re.compile(r'(\d+)\.\s+(.+bluez.+input.+)', re.IGNORECASE)
+
+
+def parse_bluetooth_nodes(status):
+    """
+    Find the first Bluetooth sink and source in `wpctl status` output
+    
+    Args:
+        status: Text printed by `wpctl status`
+    
+    Returns:
+        dict: {'sink_id': int, 'source_id': int, 'sink_name': str, 'source_name': str}
+    """
+    devices = {
+        'sink_id': None,
+        'source_id': None,
+        'sink_name': None,
+        'source_name': None
+    }
+    
+    # Single pass over the lines; a line may match both patterns
+    for line in status.splitlines():
+        for role, pattern in (('sink', _SINK_RE), ('source', _SOURCE_RE)):
+            if devices[f'{role}_id'] is None:
+                match = pattern.search(line)
+                if match:
+                    devices[f'{role}_id'] = int(match.group(1))
+                    devices[f'{role}_name'] = match.group(2).strip()
+        if devices['sink_id'] is not None and devices['source_id'] is not None:
+            break
+    
+    return devices
 
 
 def get_bluetooth_audio_devices():
@@ -27,38 +67,21 @@ def get_bluetooth_audio_devices():
         print(f"⚠️  Could not get audio status: {e}")
         return {'sink_id': None, 'source_id': None, 'sink_name': None, 'source_name': None}
     
-    devices = {
-        'sink_id': None,
-        'source_id': None,
-        'sink_name': None,
-        'source_name': None
-    }
-    
-    # Find Bluetooth sink (speakers/headphones)
-    sink_pattern = r'(\d+)\.\s+(.+bluez.+output.+)'
-    match = re.search(sink_pattern, status, re.IGNORECASE)
-    if match:
-        devices['sink_id'] = int(match.group(1))
-        devices['sink_name'] = match.group(2).strip()
-    
-    # Find Bluetooth source (microphone)
-    source_pattern = r'(\d+)\.\s+(.+bluez.+input.+)'
-    match = re.search(source_pattern, status, re.IGNORECASE)
-    if match:
-        devices['source_id'] = int(match.group(1))
-        devices['source_name'] = match.group(2).strip()
-    
-    return devices
+    return parse_bluetooth_nodes(status)
 
 
-def set_bluetooth_as_default():
+def set_bluetooth_as_default(devices=None):
     """
     Set Bluetooth devices as default audio devices
     
+    Args:
+        devices: Result of get_bluetooth_audio_devices() (looked up if None)
+    
     Returns:
         bool: True if successful, False otherwise
     """
-    devices = get_bluetooth_audio_devices()
+    if devices is None:
+        devices = get_bluetooth_audio_devices()
     
     if not devices['sink_id'] and not devices['source_id']:
         print("❌ No Bluetooth audio devices found")
@@ -166,13 +189,20 @@ def ensure_bluetooth_headset_profile():
         return False
 
 
-def initialize_audio():
+def initialize_audio(force=False):
     """
     Complete audio initialization for SmartFace
     
+    Args:
+        force: Re-run discovery even if a recent result is cached
+    
     Returns:
         dict: Audio configuration {'bluetooth_index': int, 'devices': dict}
     """
+    if (not force and _cache['config'] is not None
+            and time.monotonic() - _cache['mtime'] < _CACHE_TTL):
+        return _cache['config']
+    
     print("\n🎵 Initializing audio devices...")
     
     # Step 1: Set Bluetooth profile
@@ -187,9 +217,10 @@ def initialize_audio():
         return None
     
     # Step 3: Set as default
-    set_bluetooth_as_default()
+    set_bluetooth_as_default(devices)
     
-    # Step 4: Get PyAudio index
+    # Step 4: Get PyAudio index (after the default is set, so PortAudio
+    # enumerates the routed devices)
     bluetooth_index = get_pyaudio_bluetooth_index()
     
     if bluetooth_index is None:
@@ -203,4 +234,7 @@ def initialize_audio():
     
     print("✅ Audio initialization complete\n")
     
+    _cache['config'] = config
+    _cache['mtime'] = time.monotonic()
+    
     return config
\ No newline at end of file
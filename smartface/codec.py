@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Audio codec for SmartFace uploads
+G.711 μ-law (PCMU): 16-bit PCM <-> 8-bit, half the bytes on the wire,
+plus the WAV / content-type parsing the server applies to uploads
+"""
+
+import struct
+
+import numpy as np
+
+# Sample rates clients may send audio at
+ALLOWED_RATES = frozenset({8000, 11025, 16000, 22050, 32000, 44100, 48000})
+
+_BIAS = 0x84
+_CLIP = 32635
+
+# Segment (exponent) for the top 8 bits of a biased magnitude
+_EXP_LUT = np.zeros(256, dtype=np.int16)
+for _i in range(1, 256):
+    _EXP_LUT[_i] = _i.bit_length() - 1
+
+
+def _build_decode_table():
+    """All 256 μ-law codes decoded to int16"""
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (u >> 4) & 0x07
+    mantissa = u & 0x0F
+    magnitude = (((mantissa << 3) + _BIAS) << exponent) - _BIAS
+    return np.where(u & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+_DECODE_TABLE = _build_decode_table()
+
+
+def mulaw_encode(pcm) -> bytes:
+    """
+    Encode 16-bit PCM to μ-law
+
+    Args:
+        pcm: 16-bit little-endian mono PCM (bytes-like)
+
+    Returns:
+        bytes: One μ-law byte per sample
+    """
+    x = np.frombuffer(pcm, dtype=np.int16).astype(np.int32)
+    sign = (x >> 8) & 0x80
+    magnitude = np.minimum(np.abs(x), _CLIP) + _BIAS
+    exponent = _EXP_LUT[magnitude >> 7]
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def mulaw_decode(data) -> bytes:
+    """
+    Decode μ-law to 16-bit PCM
+
+    Args:
+        data: μ-law bytes (bytes-like)
+
+    Returns:
+        bytes: 16-bit little-endian mono PCM
+    """
+    return _DECODE_TABLE[np.frombuffer(data, dtype=np.uint8)].tobytes()
+
+
+def parse_wav(data) -> tuple:
+    """
+    Locate the samples of a RIFF/WAVE buffer (header length varies)
+
+    Args:
+        data: WAV file contents (bytes, mmap, ...)
+
+    Returns:
+        tuple: (sample_rate, memoryview of the data chunk)
+    """
+    if data[0:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise ValueError("not a WAV file")
+
+    rate = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        size, = struct.unpack_from('<I', data, pos + 4)
+        pos += 8
+        if chunk_id == b'fmt ':
+            rate, = struct.unpack_from('<I', data, pos + 4)
+        elif chunk_id == b'data':
+            if rate is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            return rate, memoryview(data)[pos:pos + size]
+        pos += size + (size & 1)  # chunks are word aligned
+
+    raise ValueError("WAV has no data chunk")
+
+
+def validate_rate(rate) -> int:
+    """
+    Check a client-supplied sample rate before building a recognizer
+
+    Raises:
+        ValueError: not an int from ALLOWED_RATES
+    """
+    try:
+        value = int(rate)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid sample rate: {rate!r}")
+    if value not in ALLOWED_RATES:
+        raise ValueError(f"Unsupported sample rate: {value}")
+    return value
+
+
+def parse_pcm_rate(content_type: str, default: int = 16000) -> int:
+    """Read the sample rate from an audio/L16 or audio/PCMU content type"""
+    for param in content_type.split(';')[1:]:
+        key, _, value = param.partition('=')
+        if key.strip().lower() == 'rate' and value.strip().isdigit():
+            return int(value)
+    return default
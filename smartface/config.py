@@ -7,6 +7,13 @@ import os
 # Disable warning
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+# ============================================================================
+# PLATFORM
+# ============================================================================
+
+# Raspberry Pi profile (replaces the separate config_rpi module)
+IS_RPI = os.path.exists('/sys/firmware/devicetree/base/model')
+
 # ============================================================================
 # PATHS
 # ============================================================================
@@ -18,6 +25,9 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 # Vosk model
 VOSK_MODEL_PATH = os.path.join(MODELS_DIR, "vosk", "small-en")
 
+# Sentence encoder exported to ONNX with int8 weights (Raspberry Pi only)
+NLP_ONNX_DIR = os.path.join(MODELS_DIR, "minilm-onnx")
+
 # Reminders
 REMINDERS_FILE = os.path.join(DATA_DIR, "reminders", "reminders.json")
 
@@ -28,6 +38,9 @@ REMINDERS_FILE = os.path.join(DATA_DIR, "reminders", "reminders.json")
 SERVER_HOST = "192.168.1.72"
 SERVER_PORT = 8000
 
+# Vosk recognizers kept ready for concurrent requests
+RECOGNIZER_POOL_SIZE = 2
+
 # Change this to your server IP!
 DEFAULT_SERVER_IP = "192.168.1.100"
 SERVER_URL = f"http://{DEFAULT_SERVER_IP}:{SERVER_PORT}"
@@ -37,13 +50,29 @@ SERVER_URL = f"http://{DEFAULT_SERVER_IP}:{SERVER_PORT}"
 # ============================================================================
 
 SAMPLE_RATE = 16000
-CHUNK_SIZE = 8192
+CHUNK_SIZE = 512  # 32 ms per read = one VAD window (256/512/1024 recommended)
 
-# Voice detection
-SILENCE_THRESHOLD = 50
+# Local speech recognition (smartface.stt) reads bigger buffers on a Pi
+STT_CHUNK_SIZE = 2048 if IS_RPI else CHUNK_SIZE
+
+# Voice detection: speech ends after SILENCE_TIMEOUT seconds of silence
+SILENCE_TIMEOUT = 1.6
+SILENCE_THRESHOLD = round(SILENCE_TIMEOUT * SAMPLE_RATE / CHUNK_SIZE)  # in CHUNK_SIZE chunks
 ENERGY_THRESHOLD = 500
 LISTEN_TIMEOUT = 15
 
+# Client VAD with hysteresis, as scores in [0, 1]: (dBFS + 100) / 100
+# Speech starts above VAD_ONSET and continues until below VAD_OFFSET
+# (0.64 ≈ -36 dBFS ≈ RMS 500, 0.56 ≈ -44 dBFS ≈ RMS 205)
+VAD_ONSET = 0.64
+VAD_OFFSET = 0.56
+
+# Before speech starts, only check every Nth chunk (client)
+VAD_PRE_SPEECH_STRIDE = 3
+
+# FFTW plans measured for enhance_speech are kept here (needs pyfftw)
+FFTW_WISDOM_FILE = os.path.join(os.path.expanduser("~"), ".cache", "smartface", "fftw_wisdom")
+
 # ============================================================================
 # TTS (Client)
 # ============================================================================
@@ -51,12 +80,21 @@ LISTEN_TIMEOUT = 15
 TTS_RATE = 175
 TTS_VOLUME = 100
 
+# Synthesized phrases are cached on disk and replayed
+TTS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "smartface", "tts")
+TTS_CACHE_SIZE = 64
+
 # ============================================================================
 # NLP (Server)
 # ============================================================================
 
 INTENT_CONFIDENCE_THRESHOLD = 0.4
 
+# Concurrent /process_text queries are classified together:
+# up to INTENT_BATCH_SIZE texts, waiting at most INTENT_BATCH_TIMEOUT_MS
+INTENT_BATCH_SIZE = 16
+INTENT_BATCH_TIMEOUT_MS = 10
+
 # ============================================================================
 # SMART HOME
 # ============================================================================
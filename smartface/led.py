@@ -3,6 +3,8 @@ LED Controller for Raspberry Pi
 Controls status LEDs during voice interaction
 """
 
+import threading
+
 try:
     import RPi.GPIO as GPIO
     GPIO_AVAILABLE = True
@@ -22,9 +24,24 @@ class LEDController:
     BLUE_LED_PIN = 17   # GPIO 17 (Physical pin 11)
     RED_LED_PIN = 27    # GPIO 18 (Physical pin 13)
     
+    # Error blink: 3 on/off cycles at 0.2 s per step
+    BLINK_STEPS = 6
+    BLINK_INTERVAL = 0.2
+    
     def __init__(self):
         self.enabled = GPIO_AVAILABLE
         
+        # Both pins are written in one GPIO.output call
+        self._pins = (self.BLUE_LED_PIN, self.RED_LED_PIN)
+        
+        # The error blink runs its full cycle: idle/processing requested
+        # meanwhile is applied when it ends. Listening or turning the LEDs
+        # off cancels it (bumps the generation)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._blinking = False
+        self._after_blink = (False, True)
+        
         if not self.enabled:
             print("🔴 LED Controller: Disabled (not on Raspberry Pi)")
             return
@@ -49,56 +66,77 @@ class LEDController:
             print(f"⚠️  LED Controller: Init failed - {e}")
             self.enabled = False
     
-    def set_listening(self):
-        """Blue LED ON - listening/recording"""
+    def _set(self, blue, red, interrupt=True):
+        """
+        Write both LEDs (True = on) in one call
+        
+        Args:
+            blue, red: LED states
+            interrupt: Cancel a running error blink; otherwise the state
+                is applied once the blink ends
+        """
         if not self.enabled:
             return
         try:
-            GPIO.output(self.BLUE_LED_PIN, GPIO.HIGH)
-            GPIO.output(self.RED_LED_PIN, GPIO.LOW)
+            with self._lock:
+                if self._blinking and not interrupt:
+                    self._after_blink = (blue, red)
+                    return
+                self._generation += 1
+                self._blinking = False
+                GPIO.output(self._pins, (blue, red))
         except:
             pass
     
+    def set_listening(self):
+        """Blue LED ON - listening/recording"""
+        self._set(True, False)
+    
     def set_processing(self):
-        """Red LED ON - processing/thinking"""
-        if not self.enabled:
-            return
-        try:
-            GPIO.output(self.BLUE_LED_PIN, GPIO.LOW)
-            GPIO.output(self.RED_LED_PIN, GPIO.HIGH)
-        except:
-            pass
+        """Red LED ON - processing/thinking (waits for an error blink to end)"""
+        self._set(False, True, interrupt=False)
     
     def set_idle(self):
         """Red LED ON - idle/ready"""
         self.set_processing()  # Same as processing
     
     def set_error(self):
-        """Both LEDs blink - error state"""
+        """Both LEDs blink - error state (returns immediately)"""
         if not self.enabled:
             return
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._blinking = True
+            self._after_blink = (False, True)
+        self._blink(self.BLINK_STEPS, generation)
+    
+    def _blink(self, steps, generation):
+        """One blink step; the next one runs on a timer thread"""
         try:
-            for _ in range(3):
-                GPIO.output(self.BLUE_LED_PIN, GPIO.HIGH)
-                GPIO.output(self.RED_LED_PIN, GPIO.HIGH)
-                import time
-                time.sleep(0.2)
-                GPIO.output(self.BLUE_LED_PIN, GPIO.LOW)
-                GPIO.output(self.RED_LED_PIN, GPIO.LOW)
-                time.sleep(0.2)
-            self.set_idle()
+            with self._lock:
+                if generation != self._generation:
+                    return  # Superseded by a newer state
+                
+                if steps == 0:
+                    # Back to idle, or whatever was requested meanwhile
+                    self._blinking = False
+                    GPIO.output(self._pins, self._after_blink)
+                    return
+                
+                level = steps % 2 == 0
+                GPIO.output(self._pins, (level, level))
+            
+            timer = threading.Timer(self.BLINK_INTERVAL, self._blink,
+                                    (steps - 1, generation))
+            timer.daemon = True
+            timer.start()
         except:
             pass
     
     def all_off(self):
         """Turn off all LEDs"""
-        if not self.enabled:
-            return
-        try:
-            GPIO.output(self.BLUE_LED_PIN, GPIO.LOW)
-            GPIO.output(self.RED_LED_PIN, GPIO.LOW)
-        except:
-            pass
+        self._set(False, False)
     
     def cleanup(self):
         """Cleanup GPIO on exit"""
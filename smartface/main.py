@@ -6,19 +6,11 @@ from smartface.skills.web_search import WebSearchSkill
 from smartface.skills.reminder import ReminderSkill
 from smartface.skills.smart_home import SmartHomeSkill
 from smartface.skills.weather import WeatherSkill, WeatherSkillOffline
-import time
-import os
-import platform
+import threading
 
-# Detect if on Raspberry Pi
-IS_RPI = os.path.exists('/sys/firmware/devicetree/base/model')
+# Raspberry Pi settings are selected inside config (IS_RPI)
+from smartface.config import *
 
-if IS_RPI:
-    # Use Pi-specific config
-    from smartface.config_rpi import *
-else:
-    from smartface.config import *
-    
 # Import API keys if available
 try:
     from smartface.api_keys import OPENWEATHER_API_KEY, DEFAULT_WEATHER_CITY
@@ -26,6 +18,9 @@ except ImportError:
     OPENWEATHER_API_KEY = None
     DEFAULT_WEATHER_CITY = "London"
 
+# Spoken commands that end the session
+_EXIT_COMMANDS = frozenset({'exit', 'quit', 'stop'})
+
 
 class SmartFace:
     """
@@ -43,18 +38,29 @@ class SmartFace:
         self.nlp = NLPProcessor()
         self.response_handler = ResponseHandler()
         
-        # Initialize skills
-        self.web_search = WebSearchSkill()
-        self.reminders = ReminderSkill()
-        self.smart_home = SmartHomeSkill()
+        # Skills are created on first use; a background thread warms them
+        # up while the welcome message plays
+        self._skills = {}
+        self._skills_lock = threading.Lock()
+        threading.Thread(target=self._warmup, daemon=True).start()
         
-        # Initialize weather skill
-        if OPENWEATHER_API_KEY and OPENWEATHER_API_KEY != "a42d24d326db9153a9ebebdaab56d41b":
-            self.weather = WeatherSkill(api_key=OPENWEATHER_API_KEY)
-            self.weather.set_default_city(DEFAULT_WEATHER_CITY)
-        else:
-            print("⚠️  No OpenWeather API key found, using offline weather")
-            self.weather = WeatherSkillOffline()
+        # Intent routing: canned responses, then skill handlers
+        # (each handler takes intent, entities, text)
+        self._static_intents = frozenset({
+            'greet', 'goodbye', 'how_are_you', 'thank', 'name',
+            'help', 'joke', 'time', 'date'
+        })
+        self._dispatch = {
+            'web_search': self._handle_web_search,
+            'reminder_set': self._handle_reminder,
+            'reminder_list': self._handle_reminder,
+            'light_on': self._handle_smart_home,
+            'light_off': self._handle_smart_home,
+            'temperature_set': self._handle_smart_home,
+            'device_status': self._handle_smart_home,
+            'weather': self._handle_weather,
+            'weather_city': self._handle_weather,
+        }
         
         # Track conversation state
         self.running = False
@@ -64,6 +70,48 @@ class SmartFace:
         print("✅ SmartFace is ready!")
         print("="*60 + "\n")
     
+    def _skill(self, name, factory):
+        """Skill instance by name, created by factory() on first access"""
+        skill = self._skills.get(name)
+        if skill is None:
+            with self._skills_lock:
+                skill = self._skills.get(name)
+                if skill is None:
+                    skill = self._skills[name] = factory()
+        return skill
+    
+    def _warmup(self):
+        """Initialize every skill ahead of the first request"""
+        try:
+            self.web_search, self.reminders, self.smart_home, self.weather
+        except Exception as e:
+            print(f"⚠️  Skill warm-up failed: {e}")
+    
+    @property
+    def web_search(self):
+        return self._skill('web_search', WebSearchSkill)
+    
+    @property
+    def reminders(self):
+        return self._skill('reminders', ReminderSkill)
+    
+    @property
+    def smart_home(self):
+        return self._skill('smart_home', SmartHomeSkill)
+    
+    @property
+    def weather(self):
+        return self._skill('weather', self._create_weather)
+    
+    def _create_weather(self):
+        """Online weather skill when an API key is set, offline otherwise"""
+        if OPENWEATHER_API_KEY and OPENWEATHER_API_KEY != "a42d24d326db9153a9ebebdaab56d41b":
+            weather = WeatherSkill(api_key=OPENWEATHER_API_KEY)
+            weather.set_default_city(DEFAULT_WEATHER_CITY)
+            return weather
+        print("⚠️  No OpenWeather API key found, using offline weather")
+        return WeatherSkillOffline()
+    
     def start(self):
         """Start the voice assistant"""
         self.running = True
@@ -72,7 +120,6 @@ class SmartFace:
         welcome = "Hello! I'm SmartFace, your voice assistant. How can I help you today?"
         print(f"🤖 {welcome}")
         self.tts.speak(welcome)
-        time.sleep(0.5)
         
         try:
             self._conversation_loop()
@@ -93,7 +140,8 @@ class SmartFace:
             print(f"Exchange #{self.conversation_count}")
             print('─'*60)
             
-            # Listen for user input
+            # Listen for user input (drop audio recorded while we spoke)
+            self.stt.flush()
             user_text = self.stt.listen()
             
             # Handle empty input
@@ -101,37 +149,35 @@ class SmartFace:
                 response = "I didn't catch that. Please try again."
                 print(f"🤖 {response}")
                 self.tts.speak(response)
-                time.sleep(0.5)
                 continue
             
             # Process input
             response = self._process_input(user_text)
             
-            # Speak response
+            # Speak response, then listen right away
             if response:
                 print(f"🤖 {response}")
                 self.tts.speak(response)
-                time.sleep(0.5)
     
     def _process_input(self, text):
         """Process user input and generate response"""
         print(f"\n📝 Processing: \"{text}\"")
         
-        # Classify intent
-        intent, confidence = self.nlp.classify_intent(text)
+        # Normalize once for every check below
+        text_lower = text.strip().lower()
+        
+        # Classify intent and extract entities
+        intent, confidence, entities = self.nlp.understand(text, text_lower=text_lower)
         print(f"💡 Intent: {intent} (confidence: {confidence:.2f})")
         
-        # Extract entities
-        entities = self.nlp.extract_entities(text, intent)
         if entities:
             print(f"🔍 Entities: {entities}")
         
         # Check for exit commands
-        if intent == 'goodbye' or text.lower() in ['exit', 'quit', 'stop']:
+        if intent == 'goodbye' or text_lower in _EXIT_COMMANDS:
             farewell = self.response_handler.generate_response('goodbye')
             print(f"🤖 {farewell}")
             self.tts.speak(farewell)
-            time.sleep(1)
             self.running = False
             return None
         
@@ -142,32 +188,19 @@ class SmartFace:
             confidence = 0.7
         
         # Route to appropriate handler based on intent
-        if intent in ['greet', 'goodbye', 'how_are_you', 'thank', 'name', 
-                      'help', 'joke', 'time', 'date']:
-            response = self.response_handler.generate_response(intent, entities, confidence)
-        
-        elif intent == 'web_search':
-            response = self._handle_web_search(entities)
-        
-        elif intent in ['reminder_set', 'reminder_list']:
-            response = self._handle_reminder(intent, entities, text)
+        if intent in self._static_intents:
+            return self.response_handler.generate_response(intent, entities, confidence)
         
-        elif intent in ['light_on', 'light_off', 'temperature_set', 'device_status']:
-            response = self._handle_smart_home(intent, entities, text)
+        handler = self._dispatch.get(intent)
+        if handler:
+            return handler(intent, entities, text)
         
-        elif intent in ['weather', 'weather_city']:
-            response = self._handle_weather(entities, text)
-        
-        else:
-            # Unknown intent - try to be helpful
-            if entities.get('query'):
-                response = f"I'm not sure what you're asking, but I can search for information. Would you like me to search for '{entities['query']}'?"
-            else:
-                response = self.response_handler.generate_response('unknown')
-        
-        return response
+        # Unknown intent - try to be helpful
+        if entities.get('query'):
+            return f"I'm not sure what you're asking, but I can search for information. Would you like me to search for '{entities['query']}'?"
+        return self.response_handler.generate_response('unknown')
     
-    def _handle_web_search(self, entities):
+    def _handle_web_search(self, intent, entities, text):
         """Handle web search requests"""
         query = entities.get('query', '').strip()
         
@@ -224,7 +257,7 @@ class SmartFace:
         
         return "I'm not sure what you want to do with your devices."
     
-    def _handle_weather(self, entities, text):
+    def _handle_weather(self, intent, entities, text):
         """Handle weather requests"""
         print(f"🌤️ Getting weather information...")
         return self.weather.handle('weather', entities, text)
@@ -236,6 +269,12 @@ class SmartFace:
         if hasattr(self, 'stt'):
             self.stt.close()
         
+        if hasattr(self, 'tts'):
+            self.tts.close()
+        
+        if 'reminders' in self._skills:
+            self._skills['reminders'].close()
+        
         print(f"📊 Total exchanges: {self.conversation_count}")
         print("✅ Goodbye!\n")
 
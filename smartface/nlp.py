@@ -1,6 +1,143 @@
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from collections import Counter
 import numpy as np
+import os
+import re
+from smartface.config import IS_RPI, NLP_ONNX_DIR
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import onnxruntime
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+ENCODER_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+
+# Entity patterns, compiled once
+_NUM_RE = re.compile(r'\d+')
+_ROOM_RE = re.compile(r'living room|bedroom|kitchen|bathroom|garage')
+_QUESTION_STARTS = ('what', 'who', 'where', 'when', 'why', 'how', 'tell me about', 'search')
+_QUESTION_RE = re.compile('|'.join(_QUESTION_STARTS))
+_REMINDER_PATTERNS = ('remind me to', 'remind me', 'reminder to',
+                      'don\'t let me forget to', 'remember to')
+_SEARCH_RE = re.compile(
+    r'\b(?:search for|look up|find|what is|who is|tell me about|google|search'
+    r'|what are|who are|where is|when is|why is|how is)\b',
+    re.IGNORECASE
+)
+
+
+if NUMBA_AVAILABLE:
+    @njit('Tuple((int64, float32))(float32[:, ::1], int64[::1], int64[::1], float32[::1], float32)',
+          cache=True, fastmath=True)
+    def _classify_kernel(matrix, bounds, order, query, early_exit):
+        """
+        Best intent for one unit-length query, without materializing the
+        similarity vector
+        
+        Args:
+            matrix: (N, D) unit-length example embeddings, grouped by intent
+            bounds: Row boundaries, intent i is rows bounds[i]:bounds[i + 1]
+            order: Intent indices in the order to score them
+            query: (D,) unit-length query embedding
+            early_exit: Stop scanning once an intent scores above this
+            
+        Returns:
+            tuple: (intent index, best cosine similarity)
+        """
+        best_i = -1
+        best_s = np.float32(-1.0)
+        for i in order:
+            for r in range(bounds[i], bounds[i + 1]):
+                s = np.float32(0.0)
+                for d in range(matrix.shape[1]):
+                    s += matrix[r, d] * query[d]
+                if s > best_s:
+                    best_s = s
+                    best_i = i
+            if best_s > early_exit:
+                break
+        return best_i, best_s
+
+
+class OnnxEncoder:
+    """
+    all-MiniLM-L6-v2 as an int8 ONNX model on onnxruntime
+    Drop-in for the SentenceTransformer.encode() calls made below
+    """
+    
+    MODEL_FILE = 'model_q8.onnx'
+    MAX_LENGTH = 256
+    
+    def __init__(self, model_dir=NLP_ONNX_DIR):
+        model_path = os.path.join(model_dir, self.MODEL_FILE)
+        if not os.path.exists(model_path):
+            self._export(model_dir)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = onnxruntime.InferenceSession(
+            model_path, providers=['CPUExecutionProvider']
+        )
+        self._inputs = {i.name for i in self.session.get_inputs()}
+    
+    def _export(self, model_dir):
+        """Export the encoder to ONNX and quantize its weights (first run only)"""
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        
+        print("🔧 Exporting NLP model to ONNX (first run)...")
+        model = ORTModelForFeatureExtraction.from_pretrained(ENCODER_NAME, export=True)
+        model.save_pretrained(model_dir)
+        AutoTokenizer.from_pretrained(ENCODER_NAME).save_pretrained(model_dir)
+        quantize_dynamic(
+            os.path.join(model_dir, 'model.onnx'),
+            os.path.join(model_dir, self.MODEL_FILE),
+            weight_type=QuantType.QInt8
+        )
+    
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True,
+               normalize_embeddings=False, **kwargs):
+        """
+        Encode sentences (mean pooling over tokens, like sentence-transformers)
+        
+        Args:
+            sentences: A string or a list of strings
+            batch_size: Sentences per forward pass
+            normalize_embeddings: Scale embeddings to unit length
+            
+        Returns:
+            np.ndarray: (D,) for a string, (N, D) for a list
+        """
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        
+        out = []
+        for start in range(0, len(sentences), batch_size):
+            batch = self.tokenizer(
+                sentences[start:start + batch_size], padding=True,
+                truncation=True, max_length=self.MAX_LENGTH, return_tensors='np'
+            )
+            feeds = {k: v.astype(np.int64) for k, v in batch.items() if k in self._inputs}
+            tokens = self.session.run(None, feeds)[0]
+            
+            mask = batch['attention_mask'][..., None].astype(np.float32)
+            summed = (tokens * mask).sum(axis=1)
+            out.append(summed / np.maximum(mask.sum(axis=1), 1e-9))
+        
+        embeddings = np.vstack(out).astype(np.float32)
+        if normalize_embeddings:
+            embeddings /= np.maximum(
+                np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12
+            )
+        return embeddings[0] if single else embeddings
 
 
 class NLPProcessor:
@@ -9,13 +146,29 @@ class NLPProcessor:
     Uses sentence embeddings for semantic understanding
     """
     
+    # Entries kept in each result cache
+    CACHE_SIZE = 256
+    
+    # Intents are scored most frequent first; a match this close ends the scan
+    EARLY_EXIT = 0.85
+    REORDER_EVERY = 50
+    
     def __init__(self):
         print("🔧 Initializing NLP processor...")
         
-        # Load sentence transformer model
+        # Load sentence transformer model (int8 ONNX on the Pi when available)
+        self.model = None
+        if IS_RPI and ONNX_AVAILABLE:
+            try:
+                self.model = OnnxEncoder()
+                print("✅ NLP model loaded (ONNX int8)")
+            except Exception as e:
+                print(f"⚠️  ONNX encoder unavailable, using PyTorch: {e}")
+        
         try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            print("✅ NLP model loaded")
+            if self.model is None:
+                self.model = SentenceTransformer('all-MiniLM-L6-v2')
+                print("✅ NLP model loaded")
         except Exception as e:
             print(f"❌ Error loading NLP model: {e}")
             raise
@@ -98,51 +251,235 @@ class NLPProcessor:
             ]
         }
         
+        # How often each intent was recognized, for the scan order
+        self._intent_counts = Counter()
+        self._classified = 0
+        
         # Precompute embeddings for all intent examples
         print("🔧 Computing intent embeddings...")
-        self.intent_embeddings = {}
-        for intent, examples in self.intents.items():
-            self.intent_embeddings[intent] = self.model.encode(examples)
+        flat = []
+        offsets = [0]
+        for examples in self.intents.values():
+            flat.extend(examples)
+            offsets.append(len(flat))
+        
+        # One batched forward pass for every example, sliced back per intent
+        all_embeddings = self.model.encode(flat, batch_size=64, convert_to_numpy=True,
+                                           normalize_embeddings=True)
+        self.intent_embeddings = {
+            intent: all_embeddings[offsets[i]:offsets[i + 1]]
+            for i, intent in enumerate(self.intents)
+        }
+        self._build_matrix()
+        self._build_exact()
+        
+        # Results for repeated utterances (bounded, least recently used out)
+        self._intent_cache = {}
+        self._entity_cache = {}
         
         print(f"✅ Loaded {len(self.intents)} intents")
     
-    def classify_intent(self, text, threshold=0.5):
+    def _build_matrix(self):
+        """
+        Stack all example embeddings into one L2-normalized float32 matrix
+        
+        Rows are grouped by intent; self._bounds holds the row boundaries
+        and self._segments the first row of each intent (for reduceat).
+        """
+        self._intent_names = list(self.intent_embeddings)
+        blocks = [np.asarray(self.intent_embeddings[name], dtype=np.float32)
+                  for name in self._intent_names]
+        self._bounds = np.cumsum([0] + [len(b) for b in blocks], dtype=np.int64)
+        self._segments = self._bounds[:-1]
+        
+        matrix = np.vstack(blocks)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        self._all_emb = matrix
+        self._reorder()
+    
+    def _reorder(self):
+        """Scan order for _classify_kernel: most frequently recognized first"""
+        counts = self._intent_counts
+        order = sorted(range(len(self._intent_names)),
+                       key=lambda i: -counts[self._intent_names[i]])
+        self._intent_order = np.asarray(order, dtype=np.int64)
+    
+    def _build_exact(self):
+        """Map every example phrase (normalized) to its intent"""
+        self._exact = {}
+        for intent, examples in self.intents.items():
+            for phrase in examples:
+                self._exact.setdefault(self._normalize(phrase), intent)
+    
+    @staticmethod
+    def _normalize(text):
+        """Lowercase, strip and drop trailing punctuation"""
+        return text.strip().lower().rstrip("?.! ")
+    
+    def understand(self, text, threshold=0.5, text_lower=None):
+        """
+        Classify intent and extract entities in one call
+        
+        Args:
+            text: User input text
+            threshold: Minimum confidence score (0-1)
+            text_lower: text.strip().lower(), if the caller already has it
+            
+        Returns:
+            tuple: (intent, confidence_score, entities)
+        """
+        if text_lower is None:
+            text_lower = text.strip().lower()
+        intent, confidence = self.classify_intent(text, threshold, text_lower)
+        
+        key = (text, intent)
+        entities = self._cache_get(self._entity_cache, key)
+        if entities is None:
+            entities = self._extract_entities(text, intent, text_lower)
+            self._cache_put(self._entity_cache, key, entities)
+        return intent, confidence, dict(entities)
+    
+    def classify_intent(self, text, threshold=0.5, text_lower=None):
         """
         Classify user intent using semantic similarity
         
         Args:
             text: User input text
             threshold: Minimum confidence score (0-1)
+            text_lower: text.strip().lower(), if the caller already has it
             
         Returns:
             tuple: (intent, confidence_score)
         """
-        if not text or not text.strip():
+        if text_lower is None:
+            text_lower = text.strip().lower() if text else ""
+        if not text_lower:
             return "unknown", 0.0
         
-        text = text.strip().lower()
+        phrase = text_lower.rstrip("?.! ")
+        key = (phrase, threshold)
+        result = self._cache_get(self._intent_cache, key)
+        if result is None:
+            result = self._classify(text_lower, phrase, threshold)
+            self._cache_put(self._intent_cache, key, result)
+        
+        if result[0] != "unknown":
+            self._intent_counts[result[0]] += 1
+            self._classified += 1
+            if self._classified % self.REORDER_EVERY == 0:
+                self._reorder()
+        return result
+    
+    def _classify(self, text, phrase, threshold):
+        """classify_intent without the result cache (text stripped and lowercased)"""
+        # Known example phrase: no need to run the model
+        hit = self._exact.get(phrase)
+        if hit:
+            return hit, 1.0
+        
+        # Encode user input (unit length, so a dot product is the cosine)
+        text_embedding = self.model.encode([text], normalize_embeddings=True)[0]
+        
+        if NUMBA_AVAILABLE:
+            # Fused dot product + max in one compiled loop, frequent
+            # intents first, stopping early on a near-certain match
+            query = np.ascontiguousarray(text_embedding, dtype=np.float32)
+            i, best_score = _classify_kernel(self._all_emb, self._bounds, self._intent_order,
+                                             query, np.float32(self.EARLY_EXIT))
+            if best_score < threshold:
+                return "unknown", best_score
+            return self._intent_names[i], best_score
+        
+        return self._best_intents(text_embedding[None, :], threshold)[0]
+    
+    def classify_intent_batch(self, texts, threshold=0.5):
+        """
+        Classify several texts with a single model.encode call
+        
+        Args:
+            texts: List of user input texts
+            threshold: Minimum confidence score (0-1)
+            
+        Returns:
+            list: (intent, confidence_score) per text
+        """
+        results = [("unknown", 0.0)] * len(texts)
         
-        # Encode user input
-        text_embedding = self.model.encode([text])[0]
+        # Cached or exact-match texts first, then one encode for the rest
+        misses = {}
+        for i, text in enumerate(texts):
+            text_lower = text.strip().lower() if text else ""
+            if not text_lower:
+                continue
+            key = (text_lower.rstrip("?.! "), threshold)
+            result = self._cache_get(self._intent_cache, key)
+            if result is None:
+                result = self._exact.get(key[0])
+                result = (result, 1.0) if result else None
+            if result is None:
+                misses.setdefault(text_lower, []).append((i, key))
+            else:
+                results[i] = result
+        if not misses:
+            return results
         
-        best_intent = "unknown"
-        best_score = 0.0
+        embeddings = self.model.encode(list(misses), normalize_embeddings=True)
+        for slots, result in zip(misses.values(), self._best_intents(embeddings, threshold)):
+            for i, key in slots:
+                results[i] = result
+                self._cache_put(self._intent_cache, key, result)
+        
+        return results
+    
+    def _cache_get(self, cache, key):
+        """Cached value or None; a hit becomes the most recently used"""
+        value = cache.pop(key, None)
+        if value is not None:
+            cache[key] = value
+        return value
+    
+    def _cache_put(self, cache, key, value):
+        """Store a value, evicting the least recently used entry when full"""
+        cache[key] = value
+        if len(cache) > self.CACHE_SIZE:
+            try:
+                cache.pop(next(iter(cache)), None)
+            except (StopIteration, RuntimeError):
+                pass  # Emptied or resized by another thread meanwhile
+    
+    def _best_intents(self, text_embeddings, threshold):
+        """
+        Pick the intent whose examples are most similar to each embedding
         
-        # Compare with all intents
-        for intent, embeddings in self.intent_embeddings.items():
-            # Calculate similarity with all examples of this intent
-            similarities = cosine_similarity([text_embedding], embeddings)[0]
-            max_similarity = np.max(similarities)
+        Args:
+            text_embeddings: (n, D) unit-length query embeddings
+            threshold: Minimum confidence score (0-1)
             
-            if max_similarity > best_score:
-                best_score = max_similarity
-                best_intent = intent
+        Returns:
+            list: (intent, confidence_score) per row
+        """
+        # Cosine similarity with every example in one matrix product,
+        # then the best example per intent
+        similarities = np.asarray(text_embeddings, dtype=np.float32) @ self._all_emb.T
+        per_intent = np.maximum.reduceat(similarities, self._segments, axis=1)
         
-        # Only return intent if confidence is above threshold
-        if best_score < threshold:
-            return "unknown", best_score
+        # Same rule as _classify_kernel: intents in scan order, stopping at
+        # the first one that lifts the running best above EARLY_EXIT
+        scores = per_intent[:, self._intent_order]
+        running = np.maximum.accumulate(scores, axis=1)
+        above = running > self.EARLY_EXIT
+        stop = np.where(above.any(axis=1), above.argmax(axis=1), scores.shape[1] - 1)
+        best_scores = running[np.arange(len(scores)), stop]
+        best = self._intent_order[(scores == best_scores[:, None]).argmax(axis=1)]
         
-        return best_intent, best_score
+        results = []
+        for i, best_score in zip(best, best_scores):
+            # Only return intent if confidence is above threshold
+            if best_score < threshold:
+                results.append(("unknown", best_score))
+            else:
+                results.append((self._intent_names[i], best_score))
+        return results
     
     def extract_entities(self, text, intent):
         """
@@ -155,38 +492,37 @@ class NLPProcessor:
         Returns:
             dict: Extracted entities
         """
-        text_lower = text.lower()
+        key = (text, intent)
+        entities = self._cache_get(self._entity_cache, key)
+        if entities is None:
+            entities = self._extract_entities(text, intent)
+            self._cache_put(self._entity_cache, key, entities)
+        return dict(entities)  # Callers may modify their copy
+    
+    def _extract_entities(self, text, intent, text_lower=None):
+        """extract_entities without the result cache"""
+        if text_lower is None:
+            text_lower = text.lower()
         entities = {}
         
         # Extract room names
-        rooms = ['living room', 'bedroom', 'kitchen', 'bathroom', 'garage']
-        for room in rooms:
-            if room in text_lower:
-                entities['room'] = room
-                break
+        room = _ROOM_RE.search(text_lower)
+        if room:
+            entities['room'] = room.group()
         
         # Extract numbers (for temperature, time, etc.)
-        import re
-        numbers = re.findall(r'\d+', text)
-        if numbers:
-            entities['number'] = int(numbers[0])
+        number = _NUM_RE.search(text)
+        if number:
+            entities['number'] = int(number.group())
         
         # Extract search query for web_search intent OR if question words detected
-        question_words = ['what', 'who', 'where', 'when', 'why', 'how', 'tell me about', 'search']
-        is_question = any(word in text_lower for word in question_words)
+        # Question words are usually sentence-initial: check that first
+        is_question = (text_lower.startswith(_QUESTION_STARTS)
+                       or _QUESTION_RE.search(text_lower) is not None)
         
         if intent == 'web_search' or is_question or intent == 'unknown':
-            # Remove common search phrases
-            query = text
-            search_phrases = [
-                'search for', 'look up', 'find', 'what is', 'who is', 
-                'tell me about', 'google', 'search', 'what are',
-                'who are', 'where is', 'when is', 'why is', 'how is'
-            ]
-            for phrase in search_phrases:
-                query = re.sub(r'\b' + phrase + r'\b', '', query, flags=re.IGNORECASE)
-            
-            entities['query'] = query.strip()
+            # Remove common search phrases (one pass)
+            entities['query'] = _SEARCH_RE.sub('', text).strip()
             
             # If we have a query and intent was unknown, suggest it might be a search
             if is_question and intent == 'unknown':
@@ -194,21 +530,20 @@ class NLPProcessor:
         
         # Extract reminder text
         if intent == 'reminder_set':
-            # Try to extract text after "remind me to" or similar
-            reminder_patterns = ['remind me to', 'remind me', 'reminder to', 
-                            'don\'t let me forget to', 'remember to']
-            for pattern in reminder_patterns:
-                if pattern in text_lower:
-                    reminder_text = text.split(pattern, 1)[-1].strip()
-                    entities['reminder_text'] = reminder_text
-                    break
-            
-            # If no pattern matched, use the whole text
-            if 'reminder_text' not in entities:
-                entities['reminder_text'] = text
+            entities['reminder_text'] = self._extract_reminder(text, text_lower)
         
         return entities
     
+    @staticmethod
+    def _extract_reminder(text, text_lower):
+        """Reminder text after "remind me to" or similar"""
+        for pattern in _REMINDER_PATTERNS:
+            if pattern in text_lower:
+                return text.split(pattern, 1)[-1].strip()
+        
+        # If no pattern matched, use the whole text
+        return text
+    
     def add_intent_examples(self, intent, examples):
         """
         Add new examples to an existing intent or create new intent
@@ -224,4 +559,7 @@ class NLPProcessor:
         
         # Recompute embeddings for this intent
         self.intent_embeddings[intent] = self.model.encode(self.intents[intent])
+        self._build_matrix()
+        self._build_exact()
+        self._intent_cache.clear()
         print(f"✅ Updated intent '{intent}' with {len(examples)} new examples")
\ No newline at end of file
@@ -1,6 +1,10 @@
 import random
 from datetime import datetime
 
+# Formatted by hand instead of the locale-aware strftime
+_DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+_MONTHS = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+           'August', 'September', 'October', 'November', 'December')
 
 class ResponseHandler:
     """
@@ -71,6 +75,12 @@ class ResponseHandler:
             ]
         }
         
+        # Responses are fixed-size: store them as tuples
+        self.responses = {intent: tuple(options) for intent, options in self.responses.items()}
+        
+        # Pre-drawn random responses per intent, refilled when empty
+        self._pools = {intent: [] for intent in self.responses}
+        
         print("✅ Response Handler ready")
     
     def generate_response(self, intent, entities=None, confidence=0.0):
@@ -97,22 +107,32 @@ class ResponseHandler:
         
         # Get random response from predefined list
         if intent in self.responses and self.responses[intent]:
-            return random.choice(self.responses[intent])
+            return self._pick(intent)
         
         # Default to unknown
-        return random.choice(self.responses['unknown'])
+        return self._pick('unknown')
+    
+    def _pick(self, intent):
+        """Random response for intent, drawn 64 at a time"""
+        pool = self._pools.setdefault(intent, [])
+        try:
+            return pool.pop()
+        except IndexError:
+            pool.extend(random.choices(self.responses[intent], k=64))
+            return pool.pop()
     
     def _get_time_response(self):
         """Get current time"""
         now = datetime.now()
-        time_str = now.strftime("%I:%M %p")
-        return f"The current time is {time_str}"
+        hour = (now.hour - 1) % 12 + 1
+        ampm = "AM" if now.hour < 12 else "PM"
+        return f"The current time is {hour:02d}:{now.minute:02d} {ampm}"
     
     def _get_date_response(self):
         """Get current date"""
         now = datetime.now()
-        date_str = now.strftime("%A, %B %d, %Y")
-        return f"Today is {date_str}"
+        return (f"Today is {_DAYS[now.weekday()]}, {_MONTHS[now.month - 1]} "
+                f"{now.day:02d}, {now.year}")
     
     def _get_weather_response(self, entities):
         """
@@ -129,9 +149,9 @@ class ResponseHandler:
             intent: Intent name
             response: Response text
         """
-        if intent in self.responses:
-            self.responses[intent].append(response)
-        else:
-            self.responses[intent] = [response]
+        self.responses[intent] = self.responses.get(intent, ()) + (response,)
+        
+        # Redraw so the new response can come up right away
+        self._pools[intent] = []
         
         print(f"✅ Added response to '{intent}'")
\ No newline at end of file
@@ -1,23 +1,60 @@
+import atexit
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from smartface.config import REMINDERS_FILE
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Mutations since the last snapshot, one JSON line each
+REMINDERS_LOG = REMINDERS_FILE + '.wal'
+
+
+def _dumps(obj, indent=False):
+    """Serialize to JSON bytes (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
 
 class ReminderSkill:
     """
     Reminder management skill
     Stores reminders in JSON file
+    
+    Each change is appended to a log right away; the full file is
+    rewritten in batches by flush(), which then empties the log.
     """
     
+    # Seconds to wait for more changes before writing the file
+    FLUSH_DELAY = 0.25
+    
     def __init__(self):
         print("🔧 Initializing Reminder skill...")
         
         # Ensure data directory exists
         os.makedirs(os.path.dirname(REMINDERS_FILE), exist_ok=True)
         
-        # Load existing reminders
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flush_timer = None
+        
+        # Load existing reminders, plus changes not yet in the file
         self.reminders = self._load_reminders()
+        if self._replay_log():
+            self._dirty = True
+            self.flush()
+        self._reindex()
+        
+        atexit.register(self.flush)
         
         print(f"✅ Reminder skill ready ({len(self.reminders)} reminders loaded)")
     
@@ -25,22 +62,121 @@ class ReminderSkill:
         """Load reminders from file"""
         if os.path.exists(REMINDERS_FILE):
             try:
-                with open(REMINDERS_FILE, 'r') as f:
-                    return json.load(f)
+                with open(REMINDERS_FILE, 'rb') as f:
+                    return _loads(f.read())
             except Exception as e:
                 print(f"⚠️  Error loading reminders: {e}")
                 return []
         return []
     
-    def _save_reminders(self):
-        """Save reminders to file"""
+    def _reindex(self):
+        """Rebuild the id index, active count and next id from the list"""
+        self._by_id = {}
+        for reminder in self.reminders:
+            self._by_id.setdefault(reminder['id'], reminder)
+        self._active_count = sum(1 for r in self.reminders if not r.get('completed', False))
+        self._next_id = max(self._by_id, default=0) + 1
+    
+    def _replay_log(self):
+        """
+        Apply logged changes on top of the loaded reminders
+        
+        Returns:
+            int: Number of changes applied
+        """
         try:
-            with open(REMINDERS_FILE, 'w') as f:
-                json.dump(self.reminders, f, indent=2)
-            return True
-        except Exception as e:
-            print(f"❌ Error saving reminders: {e}")
-            return False
+            with open(REMINDERS_LOG, 'rb') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return 0
+        
+        applied = 0
+        for line in lines:
+            try:
+                entry = _loads(line)
+            except ValueError:
+                break  # Torn last write
+            self._apply(entry['op'], entry['r'])
+            applied += 1
+        return applied
+    
+    def _apply(self, op, value):
+        """Redo one logged change (replaying twice is harmless)"""
+        if op == 'add':
+            key = (value['id'], value['created'])
+            if all((r['id'], r['created']) != key for r in self.reminders):
+                self.reminders.append(value)
+        elif op == 'complete':
+            for reminder in self.reminders:
+                if reminder['id'] == value:
+                    reminder['completed'] = True
+                    break
+        elif op == 'delete':
+            for i, reminder in enumerate(self.reminders):
+                if reminder['id'] == value:
+                    self.reminders.pop(i)
+                    break
+        elif op == 'clear_completed':
+            self.reminders = [r for r in self.reminders if not r.get('completed', False)]
+    
+    def _save_reminders(self, op, value=None):
+        """
+        Log one change, then schedule a save: changes within FLUSH_DELAY
+        share one write of the full file
+        
+        Args:
+            op: 'add', 'complete', 'delete' or 'clear_completed'
+            value: The new reminder for 'add', else the reminder id
+            
+        Returns:
+            bool: False if the change could not be logged
+        """
+        with self._lock:
+            try:
+                with open(REMINDERS_LOG, 'ab') as f:
+                    f.write(_dumps({'op': op, 'r': value}) + b'\n')
+            except Exception as e:
+                print(f"❌ Error saving reminders: {e}")
+                return False
+            
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.FLUSH_DELAY, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        return True
+    
+    def flush(self):
+        """
+        Write pending changes to file (atomically, via a temp file)
+        
+        Returns:
+            bool: False if the write failed
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return True
+            
+            tmp_file = REMINDERS_FILE + '.tmp'
+            try:
+                with open(tmp_file, 'wb') as f:
+                    f.write(_dumps(self.reminders, indent=True))
+                os.replace(tmp_file, REMINDERS_FILE)
+                
+                # Everything logged is in the file now
+                open(REMINDERS_LOG, 'wb').close()
+                self._dirty = False
+                return True
+            except Exception as e:
+                print(f"❌ Error saving reminders: {e}")
+                return False
+    
+    def close(self):
+        """Write pending changes before shutdown"""
+        self.flush()
     
     def add_reminder(self, text, time_str=None):
         """
@@ -57,15 +193,18 @@ class ReminderSkill:
             return "I need to know what to remind you about."
         
         reminder = {
-            'id': len(self.reminders) + 1,
+            'id': self._next_id,
             'text': text.strip(),
             'created': datetime.now().isoformat(),
             'completed': False
         }
         
         self.reminders.append(reminder)
+        self._by_id[reminder['id']] = reminder
+        self._active_count += 1
+        self._next_id += 1
         
-        if self._save_reminders():
+        if self._save_reminders('add', reminder):
             return f"Got it! I've added a reminder: {text}"
         else:
             return "I had trouble saving that reminder. Please try again."
@@ -77,19 +216,18 @@ class ReminderSkill:
         Returns:
             str: List of reminders
         """
-        active_reminders = [r for r in self.reminders if not r.get('completed', False)]
-        
-        if not active_reminders:
+        if not self._active_count:
             return "You don't have any reminders right now."
         
+        active_reminders = [r for r in self.reminders if not r.get('completed', False)]
+        
         if len(active_reminders) == 1:
             return f"You have 1 reminder: {active_reminders[0]['text']}"
         
-        response = f"You have {len(active_reminders)} reminders:\n"
-        for i, reminder in enumerate(active_reminders, 1):
-            response += f"{i}. {reminder['text']}\n"
+        lines = [f"You have {len(active_reminders)} reminders:"]
+        lines.extend(f"{i}. {reminder['text']}" for i, reminder in enumerate(active_reminders, 1))
         
-        return response.strip()
+        return "\n".join(lines)
     
     def complete_reminder(self, reminder_id):
         """
@@ -101,15 +239,17 @@ class ReminderSkill:
         Returns:
             str: Confirmation message
         """
-        for reminder in self.reminders:
-            if reminder['id'] == reminder_id:
-                reminder['completed'] = True
-                if self._save_reminders():
-                    return f"Marked reminder as complete: {reminder['text']}"
-                else:
-                    return "I had trouble updating that reminder."
+        reminder = self._by_id.get(reminder_id)
+        if reminder is None:
+            return f"I couldn't find reminder #{reminder_id}"
         
-        return f"I couldn't find reminder #{reminder_id}"
+        if not reminder.get('completed', False):
+            reminder['completed'] = True
+            self._active_count -= 1
+        if self._save_reminders('complete', reminder_id):
+            return f"Marked reminder as complete: {reminder['text']}"
+        else:
+            return "I had trouble updating that reminder."
     
     def delete_reminder(self, reminder_id):
         """
@@ -121,16 +261,18 @@ class ReminderSkill:
         Returns:
             str: Confirmation message
         """
-        for i, reminder in enumerate(self.reminders):
-            if reminder['id'] == reminder_id:
-                deleted_text = reminder['text']
-                self.reminders.pop(i)
-                if self._save_reminders():
-                    return f"Deleted reminder: {deleted_text}"
-                else:
-                    return "I had trouble deleting that reminder."
+        reminder = self._by_id.get(reminder_id)
+        if reminder is None:
+            return f"I couldn't find reminder #{reminder_id}"
         
-        return f"I couldn't find reminder #{reminder_id}"
+        self.reminders.remove(reminder)
+        del self._by_id[reminder_id]
+        if not reminder.get('completed', False):
+            self._active_count -= 1
+        if self._save_reminders('delete', reminder_id):
+            return f"Deleted reminder: {reminder['text']}"
+        else:
+            return "I had trouble deleting that reminder."
     
     def clear_completed(self):
         """
@@ -139,16 +281,15 @@ class ReminderSkill:
         Returns:
             str: Confirmation message
         """
-        before_count = len(self.reminders)
-        self.reminders = [r for r in self.reminders if not r.get('completed', False)]
-        after_count = len(self.reminders)
-        
-        deleted_count = before_count - after_count
+        deleted_count = len(self.reminders) - self._active_count
         
         if deleted_count == 0:
             return "No completed reminders to clear."
         
-        if self._save_reminders():
+        self.reminders = [r for r in self.reminders if not r.get('completed', False)]
+        self._by_id = {rid: r for rid, r in self._by_id.items() if not r.get('completed', False)}
+        
+        if self._save_reminders('clear_completed'):
             return f"Cleared {deleted_count} completed reminder{'s' if deleted_count > 1 else ''}."
         else:
             return "I had trouble clearing reminders."
@@ -160,4 +301,4 @@ class ReminderSkill:
         Returns:
             int: Number of active reminders
         """
-        return len([r for r in self.reminders if not r.get('completed', False)])
\ No newline at end of file
+        return self._active_count
\ No newline at end of file
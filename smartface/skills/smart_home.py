@@ -13,9 +13,22 @@ class SmartHomeSkill:
         
         # Load device states (in-memory simulation)
         self.devices = SMART_HOME_DEVICES.copy()
+        self._index_devices()
         
         print(f"✅ Smart Home ready ({len(self.devices)} devices)")
     
+    def _index_devices(self):
+        """Group devices by kind once, so bulk operations skip the type checks"""
+        # (room, device) for every light, and (name, device) for the rest
+        self._lights = []
+        self._others = []
+        for device_name, device in self.devices.items():
+            if device['type'] == 'light':
+                room = device_name.replace('_light', '').replace('_', ' ')
+                self._lights.append((room, device))
+            elif device['type'] != 'thermostat':
+                self._others.append((device_name.replace('_', ' '), device))
+    
     def turn_on_light(self, room=None):
         """
         Turn on light in specified room
@@ -28,12 +41,10 @@ class SmartHomeSkill:
         """
         if not room:
             # Turn on all lights
-            count = 0
-            for device_name, device in self.devices.items():
-                if device['type'] == 'light':
-                    device['state'] = 'on'
-                    device['brightness'] = 100
-                    count += 1
+            for _, device in self._lights:
+                device['state'] = 'on'
+                device['brightness'] = 100
+            count = len(self._lights)
             return f"Turned on {count} light{'s' if count != 1 else ''}."
         
         # Turn on specific room light
@@ -58,12 +69,10 @@ class SmartHomeSkill:
         """
         if not room:
             # Turn off all lights
-            count = 0
-            for device_name, device in self.devices.items():
-                if device['type'] == 'light':
-                    device['state'] = 'off'
-                    device['brightness'] = 0
-                    count += 1
+            for _, device in self._lights:
+                device['state'] = 'off'
+                device['brightness'] = 0
+            count = len(self._lights)
             return f"Turned off {count} light{'s' if count != 1 else ''}."
         
         # Turn off specific room light
@@ -91,12 +100,11 @@ class SmartHomeSkill:
         
         if not room:
             # Set all lights
-            count = 0
-            for device_name, device in self.devices.items():
-                if device['type'] == 'light':
-                    device['brightness'] = brightness
-                    device['state'] = 'on' if brightness > 0 else 'off'
-                    count += 1
+            state = 'on' if brightness > 0 else 'off'
+            for _, device in self._lights:
+                device['brightness'] = brightness
+                device['state'] = state
+            count = len(self._lights)
             return f"Set brightness to {brightness}% for {count} light{'s' if count != 1 else ''}."
         
         device_key = f"{room.replace(' ', '_')}_light"
@@ -140,14 +148,12 @@ class SmartHomeSkill:
         # Lights
         lights_on = []
         lights_off = []
-        for device_name, device in self.devices.items():
-            if device['type'] == 'light':
-                room = device_name.replace('_light', '').replace('_', ' ')
-                if device['state'] == 'on':
-                    brightness = device.get('brightness', 100)
-                    lights_on.append(f"{room} ({brightness}%)")
-                else:
-                    lights_off.append(room)
+        for room, device in self._lights:
+            if device['state'] == 'on':
+                brightness = device.get('brightness', 100)
+                lights_on.append(f"{room} ({brightness}%)")
+            else:
+                lights_off.append(room)
         
         if lights_on:
             status_parts.append(f"Lights on: {', '.join(lights_on)}")
@@ -162,11 +168,9 @@ class SmartHomeSkill:
             status_parts.append(f"Thermostat: {temp}°C ({state})")
         
         # Other devices
-        for device_name, device in self.devices.items():
-            if device['type'] not in ['light', 'thermostat']:
-                name = device_name.replace('_', ' ')
-                state = device.get('state', 'unknown')
-                status_parts.append(f"{name}: {state}")
+        for name, device in self._others:
+            state = device.get('state', 'unknown')
+            status_parts.append(f"{name}: {state}")
         
         return "\n".join(status_parts)
     
@@ -1,5 +1,91 @@
+import json
 import requests
+from requests.adapters import HTTPAdapter
 import re
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Common cities, matched in one scan (longest names first)
+COMMON_CITIES = [
+    'Paris', 'London', 'New York', 'Tokyo', 'Berlin',
+    'Mumbai', 'Delhi', 'Sydney', 'Toronto', 'Dubai',
+    'Singapore', 'Moscow', 'Madrid', 'Rome', 'Amsterdam'
+]
+_CITY_RE = re.compile(
+    r'\b(' + '|'.join(sorted(COMMON_CITIES, key=len, reverse=True)) + r')\b',
+    re.IGNORECASE
+)
+_CITY_NAMES = {city.lower(): city for city in COMMON_CITIES}
+
+# "in CITY", "for CITY", "at CITY" (capitalized words), tried in this order
+_CITY_RES = tuple(
+    re.compile(prep + r' ([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)')
+    for prep in ('in', 'for', 'at')
+)
+
+
+def _new_session():
+    """HTTP session reusing keep-alive connections across lookups"""
+    session = requests.Session()
+    session.headers['User-Agent'] = 'smartface/1.0'
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class _WeatherCache:
+    """
+    Weather results per city, kept for ttl seconds
+    Concurrent lookups of the same city share one fetch
+    """
+    
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+    
+    def get(self, city, fetch):
+        """
+        Cached result for city, or fetch(city) (failures are not cached)
+        
+        Args:
+            city: City name
+            fetch: Function returning the result for a city, or None
+        """
+        key = city.strip().lower()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                return entry[1]
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+        
+        if not owner:
+            return future.result()
+        
+        result = None
+        try:
+            result = fetch(city)
+        finally:
+            with self._lock:
+                del self._pending[key]
+                if result is not None:
+                    self._entries[key] = (time.monotonic(), result)
+            future.set_result(result)
+        return result
 
 
 class WeatherSkill:
@@ -8,15 +94,44 @@ class WeatherSkill:
     Get free API key: https://openweathermap.org/api
     """
     
+    # Seconds a city's weather is reused (the API updates about every 10 min)
+    CACHE_TTL = 600
+    
+    # Seconds before a failed API probe is retried (e.g. no network at boot)
+    PROBE_RETRY = 60
+    
     def __init__(self, api_key=None):
         self.name = "WeatherSkill"
         self.api_key = api_key or "a42d24d326db9153a9ebebdaab56d41b"
         self.base_url = "http://api.openweathermap.org/data/2.5/weather"
         self.default_city = "Mohali"
+        self._cache = _WeatherCache(self.CACHE_TTL)
+        self._session = _new_session()
+        self._offline = None
         
-        # Test API connection
+        # Test API connection in the background (set once the probe is
+        # done; api_ok holds the verdict)
+        self.api_ready = threading.Event()
+        self.api_ok = None  # Unknown until the probe finishes
+        self._probe_lock = threading.Lock()
+        self._probing = False
+        self._probe_time = 0.0
         if api_key and api_key != "a42d24d326db9153a9ebebdaab56d41b":
-            self._test_connection()
+            self._start_probe()
+        else:
+            self.api_ready.set()  # Nothing to probe
+    
+    def _start_probe(self):
+        """
+        Run _test_connection in the background, unless one is running or
+        the last one ended less than PROBE_RETRY seconds ago
+        """
+        with self._probe_lock:
+            if self._probing or (self._probe_time
+                                 and time.monotonic() - self._probe_time < self.PROBE_RETRY):
+                return
+            self._probing = True
+        threading.Thread(target=self._test_connection, daemon=True).start()
     
     def _test_connection(self):
         """Test if API key works"""
@@ -26,16 +141,22 @@ class WeatherSkill:
                 'appid': self.api_key,
                 'units': 'metric'
             }
-            response = requests.get(self.base_url, params=params, timeout=5)
+            response = self._session.get(self.base_url, params=params, timeout=5)
             if response.status_code == 200:
                 print("✅ Weather API connected")
-                return True
+                self.api_ok = True
             else:
                 print(f"⚠️ Weather API error: {response.status_code}")
-                return False
+                self.api_ok = False
         except Exception as e:
             print(f"⚠️ Weather API connection failed: {e}")
-            return False
+            self.api_ok = False
+        finally:
+            with self._probe_lock:
+                self._probing = False
+                self._probe_time = time.monotonic()
+            self.api_ready.set()
+        return self.api_ok
     
     def get_intents(self):
         """Return list of (intent_name, examples) tuples"""
@@ -56,6 +177,16 @@ class WeatherSkill:
     
     def handle(self, intent, entities, user_text):
         """Handle weather request"""
+        # Probe failed: use wttr.in instead (no API key needed), and
+        # retry the API in the background once PROBE_RETRY has passed
+        self.api_ready.wait(timeout=0.5)
+        if self.api_ok is False:
+            self._start_probe()
+            if self._offline is None:
+                self._offline = WeatherSkillOffline()
+            self._offline.default_city = self.default_city
+            return self._offline.handle(intent, entities, user_text)
+        
         # Extract city from text
         city = self._extract_city(user_text, entities)
         
@@ -63,7 +194,7 @@ class WeatherSkill:
             city = self.default_city
         
         # Get weather data
-        weather_data = self._get_weather(city)
+        weather_data = self._cache.get(city, self._get_weather)
         
         if not weather_data:
             return f"Sorry, I couldn't get weather information for {city}. Please check the city name or try again later."
@@ -78,29 +209,15 @@ class WeatherSkill:
             return entities['city']
         
         # Pattern matching for "in CITY"
-        patterns = [
-            r'in ([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',  # "in Paris"
-            r'for ([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',  # "for London"
-            r'at ([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',   # "at Tokyo"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
+        for pattern in _CITY_RES:
+            match = pattern.search(text)
             if match:
                 return match.group(1)
         
         # Check for common cities
-        common_cities = [
-            'Paris', 'London', 'New York', 'Tokyo', 'Berlin', 
-            'Mumbai', 'Delhi', 'Sydney', 'Toronto', 'Dubai',
-            'Singapore', 'Moscow', 'Madrid', 'Rome', 'Amsterdam'
-        ]
-        
-        text_words = text.split()
-        for city in common_cities:
-            city_words = city.split()
-            if all(word.lower() in [w.lower() for w in text_words] for word in city_words):
-                return city
+        match = _CITY_RE.search(text)
+        if match:
+            return _CITY_NAMES[match.group(1).lower()]
         
         return None
     
@@ -113,10 +230,10 @@ class WeatherSkill:
                 'units': 'metric'
             }
             
-            response = requests.get(self.base_url, params=params, timeout=5)
+            response = self._session.get(self.base_url, params=params, timeout=5)
             
             if response.status_code == 200:
-                return response.json()
+                return _loads(response.content)
             elif response.status_code == 401:
                 print("❌ Invalid API key")
                 return None
@@ -137,14 +254,15 @@ class WeatherSkill:
     def _format_weather_response(self, data):
         """Format weather data into speech"""
         try:
+            main = data['main']
             city = data['name']
             country = data['sys']['country']
-            temp = round(data['main']['temp'])
-            feels_like = round(data['main']['feels_like'])
-            temp_min = round(data['main']['temp_min'])
-            temp_max = round(data['main']['temp_max'])
+            temp = round(main['temp'])
+            feels_like = round(main['feels_like'])
+            temp_min = round(main['temp_min'])
+            temp_max = round(main['temp_max'])
             description = data['weather'][0]['description']
-            humidity = data['main']['humidity']
+            humidity = main['humidity']
             wind_speed = round(data['wind']['speed'] * 3.6)
             
             # Build response
@@ -185,10 +303,14 @@ class WeatherSkillOffline:
     Offline weather skill (uses wttr.in - no API key needed!)
     """
     
+    CACHE_TTL = 600
+    
     def __init__(self):
         self.name = "WeatherSkillOffline"
         self.base_url = "https://wttr.in"
         self.default_city = "London"
+        self._cache = _WeatherCache(self.CACHE_TTL)
+        self._session = _new_session()
     
     def get_intents(self):
         return [
@@ -208,7 +330,7 @@ class WeatherSkillOffline:
         if not city:
             city = self.default_city
         
-        weather_data = self._get_weather_wttr(city)
+        weather_data = self._cache.get(city, self._get_weather_wttr)
         
         if not weather_data:
             return f"Sorry, I couldn't get weather information for {city}."
@@ -217,7 +339,7 @@ class WeatherSkillOffline:
     
     def _extract_city(self, text):
         """Extract city from text"""
-        match = re.search(r'in ([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', text)
+        match = _CITY_RES[0].search(text)
         if match:
             return match.group(1)
         return None
@@ -226,7 +348,7 @@ class WeatherSkillOffline:
         """Get weather from wttr.in (no API key needed)"""
         try:
             url = f"{self.base_url}/{city}?format=3"
-            response = requests.get(url, timeout=5)
+            response = self._session.get(url, timeout=5)
             
             if response.status_code == 200:
                 weather_text = response.text.strip()
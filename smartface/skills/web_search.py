@@ -1,6 +1,18 @@
-import wikipedia
-import requests
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# MediaWiki endpoints: page summaries (JSON, one request) and title search
+SUMMARY_URL = "https://en.wikipedia.org/api/rest_v1/page/summary/"
+API_URL = "https://en.wikipedia.org/w/api.php"
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
 
 
 class WebSearchSkill:
@@ -9,10 +21,27 @@ class WebSearchSkill:
     Can be extended to use other APIs
     """
     
+    # Wikipedia responses kept (least recently used out) and for how long
+    CACHE_SIZE = 256
+    CACHE_TTL = 600
+    
     def __init__(self):
         print("🔧 Initializing Web Search skill...")
-        # Set Wikipedia language
-        wikipedia.set_lang("en")
+        
+        # Keep-alive connections to Wikipedia, reused by every lookup
+        self._session = requests.Session()
+        self._session.headers['User-Agent'] = 'smartface/1.0'
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self._session.mount('https://', adapter)
+        
+        # (kind, args) -> (time fetched, response); shared by the pool
+        # workers, so only touched under the lock (fetches run outside it)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        
+        # Candidate pages are fetched concurrently
+        self._pool = ThreadPoolExecutor(max_workers=3)
+        
         print("✅ Web Search ready")
     
     def search(self, query):
@@ -55,38 +84,100 @@ class WebSearchSkill:
             str: Wikipedia summary or None if not found
         """
         try:
-            # Try different search strategies
-            search_results = wikipedia.search(query, results=5)
-            
-            if not search_results:
+            # The query itself is often a page title: one request
+            page = self._summary(query)
+            
+            # Otherwise fetch the best search matches in parallel and
+            # take the highest ranked page that exists
+            if page is None:
+                futures = [self._pool.submit(self._summary, page_title)
+                           for page_title in self._opensearch(query, 5)]
+                for future in futures:
+                    try:
+                        page = future.result()
+                    except Exception:
+                        continue
+                    if page is not None:
+                        break
+                for future in futures:
+                    future.cancel()
+            
+            if page is None:
                 return None
             
-            # Try each result until we find one that works
-            for page_title in search_results:
-                try:
-                    # Get page summary (first 3 sentences)
-                    summary = wikipedia.summary(page_title, sentences=3)
-                    
-                    response = f"According to Wikipedia: {summary}"
-                    return response
-                    
-                except wikipedia.exceptions.PageError:
-                    continue
-                except Exception:
-                    continue
-            
-            # If all failed
-            return None
+            if page.get('type') == 'disambiguation':
+                # Multiple possible pages
+                title = page.get('title', query)
+                options = [t for t in self._opensearch(query, 4) if t != title] or [title]
+                return f"I found multiple results for '{query}'. Did you mean: {', '.join(options[:3])}?"
             
-        except wikipedia.exceptions.DisambiguationError as e:
-            # Multiple possible pages
-            options = e.options[:3]
-            return f"I found multiple results for '{query}'. Did you mean: {', '.join(options)}?"
+            # Page summary (first 3 sentences)
+            summary = self._sentences(page.get('extract', ''), 3)
+            if not summary:
+                return None
+            
+            response = f"According to Wikipedia: {summary}"
+            return response
             
         except Exception as e:
             print(f"Wikipedia error: {e}")
             return None
     
+    def _cached(self, key, fetch, *args):
+        """
+        fetch(*args), reusing a result younger than CACHE_TTL
+        
+        Errors are raised and not cached; "not found" (None) is cached.
+        """
+        with self._cache_lock:
+            entry = self._cache.pop(key, None)
+            if entry is not None and time.monotonic() - entry[0] < self.CACHE_TTL:
+                self._cache[key] = entry  # Most recently used
+                return entry[1]
+        
+        value = fetch(*args)
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), value)
+            if len(self._cache) > self.CACHE_SIZE:
+                del self._cache[next(iter(self._cache))]
+        return value
+    
+    def _summary(self, title):
+        """
+        Page summary from the REST API (follows redirects, cached)
+        
+        Returns:
+            dict: Summary JSON, or None if there is no such page
+        """
+        return self._cached(('summary', title), self._fetch_summary, title)
+    
+    def _fetch_summary(self, title):
+        """_summary without the cache"""
+        response = self._session.get(SUMMARY_URL + quote(title.replace(' ', '_'), safe=''),
+                                     params={'redirect': 'true'}, timeout=5)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+    
+    def _opensearch(self, query, limit):
+        """Titles of the best matching pages (cached)"""
+        return self._cached(('opensearch', query, limit), self._fetch_opensearch, query, limit)
+    
+    def _fetch_opensearch(self, query, limit):
+        """_opensearch without the cache"""
+        response = self._session.get(API_URL, params={
+            'action': 'opensearch', 'search': query, 'limit': limit,
+            'namespace': 0, 'format': 'json'
+        }, timeout=5)
+        response.raise_for_status()
+        return response.json()[1]
+    
+    @staticmethod
+    def _sentences(text, count):
+        """First count sentences of text"""
+        return ' '.join(_SENTENCE_RE.split(text.strip(), maxsplit=count)[:count])
+    
     def _search_fallback(self, query):
         """
         Fallback when Wikipedia doesn't have results
@@ -111,11 +202,13 @@ class WebSearchSkill:
         """
         try:
             # Search for the term
-            page = wikipedia.page(term, auto_suggest=True)
+            page = self._summary(term)
+            if page is None:
+                titles = self._opensearch(term, 1)
+                page = self._summary(titles[0]) if titles else None
             
-            # Get first paragraph as definition
-            paragraphs = page.content.split('\n\n')
-            definition = paragraphs[0] if paragraphs else page.summary
+            # Lead paragraph as definition
+            definition = page['extract']
             
             # Limit length
             if len(definition) > 500:
@@ -137,7 +230,7 @@ class WebSearchSkill:
             str: Quick fact
         """
         try:
-            summary = wikipedia.summary(query, sentences=2)
+            summary = self._sentences(self._summary(query)['extract'], 2)
             return f"Quick fact: {summary}"
         except:
-            return f"I don't have quick facts about '{query}' right now."
\ No newline at end of file
+            return f"I don't have quick facts about '{query}' right now."
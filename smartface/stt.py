@@ -1,38 +1,85 @@
 import vosk
 import pyaudio
-import json
+import os
+import queue
+import re
 import time
+from collections import deque
+from functools import lru_cache
+
+import numpy as np
 from smartface.config import (
+    IS_RPI,
     VOSK_MODEL_PATH,
     SAMPLE_RATE,
-    CHUNK_SIZE,
-    SILENCE_THRESHOLD,
-    LISTEN_TIMEOUT
+    STT_CHUNK_SIZE as CHUNK_SIZE,
+    SILENCE_TIMEOUT,
+    LISTEN_TIMEOUT,
+    ENERGY_THRESHOLD
 )
 
-import os
-import platform
+# Vosk results are flat JSON objects: pull the one field we need out directly
+_TEXT_RE = re.compile(r'"text"\s*:\s*"([^"]*)"')
+_PARTIAL_RE = re.compile(r'"partial"\s*:\s*"([^"]*)"')
+
+
+def _prefetch_model(path):
+    """
+    Ask the kernel to start reading every model file in the background,
+    so Vosk finds them in the page cache instead of waiting on the disk
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                fd = os.open(os.path.join(root, name), os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
 
-# Detect if on Raspberry Pi
-IS_RPI = os.path.exists('/sys/firmware/devicetree/base/model')
 
-if IS_RPI:
-    # Use Pi-specific config
-    from smartface.config_rpi import *
-else:
-    from smartface.config import *
+@lru_cache(maxsize=None)
+def _load_model(path):
+    """Vosk model, loaded once per process and shared by every recognizer"""
+    _prefetch_model(path)
+    return vosk.Model(path)
+
 
 class SpeechToText:
     """
     Speech-to-Text using Vosk offline recognition
     """
     
+    # Audio chunks buffered between the audio callback and the recognizer
+    CAPTURE_QUEUE_SIZE = 32
+    
+    # Energy VAD: speech is louder than NOISE_RATIO x the noise floor (and
+    # than ENERGY_THRESHOLD); the floor follows quiet chunks with this damping
+    NOISE_RATIO = 1.5
+    NOISE_DAMPING = 0.85
+    
+    # Quiet chunks kept before speech starts, so Vosk hears the onset
+    PRE_ROLL = 3
+    
+    # Audio is handed to Vosk in batches of at least this many samples
+    # (0.25 s), so small VAD chunks don't mean one C call each
+    MIN_ACCEPT = SAMPLE_RATE // 4
+    
+    # ANSI erase-to-end-of-line, to overwrite the previous partial result
+    _ERASE = "\x1b[K"
+    
     def __init__(self):
         print("🔧 Initializing Speech Recognition...")
         
         # Load Vosk model
         try:
-            self.model = vosk.Model(VOSK_MODEL_PATH)
+            self.model = _load_model(VOSK_MODEL_PATH)
             self.rec = vosk.KaldiRecognizer(self.model, SAMPLE_RATE)
             self.rec.SetWords(True)
             print("✅ Vosk model loaded")
@@ -41,20 +88,32 @@ class SpeechToText:
             print(f"Make sure model exists at: {VOSK_MODEL_PATH}")
             raise
         
+        # Frames per read: bigger on a Pi (STT_CHUNK_SIZE in config),
+        # always a power of two
+        self.chunk_size = CHUNK_SIZE
+        if self.chunk_size <= 0 or self.chunk_size & (self.chunk_size - 1):
+            raise ValueError(f"STT_CHUNK_SIZE must be a power of two, got {self.chunk_size}")
+        if IS_RPI:
+            print("🍓 Running on Raspberry Pi - using optimized settings")
+        
+        # End-of-speech silence, in chunks of this size
+        self.silence_chunks = max(1, round(SILENCE_TIMEOUT * SAMPLE_RATE / self.chunk_size))
+        
         # Initialize PyAudio
         self.p = pyaudio.PyAudio()
         self.stream = None
         
+        # PortAudio's callback thread fills the queue, so the microphone
+        # keeps being drained while Vosk decodes
+        self._audio = queue.Queue(maxsize=self.CAPTURE_QUEUE_SIZE)
+        
         # Start audio stream
         self._start_stream()
         
         # Silence detection
         self.silence_counter = 0
-        # Dans __init__, ajoute:
-        if IS_RPI:
-            print("🍓 Running on Raspberry Pi - using optimized settings")
-            # Smaller buffer for Pi
-            CHUNK_SIZE = 2048
+        self.noise_floor = ENERGY_THRESHOLD / self.NOISE_RATIO
+        self.calibrate()
     
     def _start_stream(self):
         """Start audio input stream"""
@@ -64,7 +123,8 @@ class SpeechToText:
                 channels=1,
                 rate=SAMPLE_RATE,
                 input=True,
-                frames_per_buffer=CHUNK_SIZE
+                frames_per_buffer=self.chunk_size,
+                stream_callback=self._on_audio
             )
             self.stream.start_stream()
             print("✅ Microphone ready")
@@ -72,6 +132,61 @@ class SpeechToText:
             print(f"❌ Error opening microphone: {e}")
             raise
     
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: queue the chunk for listen(), dropping the oldest when full"""
+        self._put(in_data)
+        return (None, pyaudio.paContinue)
+    
+    def _put(self, item):
+        """Queue item without blocking: make room by dropping the oldest chunk"""
+        while True:
+            try:
+                self._audio.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._audio.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    def calibrate(self, seconds=0.5):
+        """
+        Measure the background noise floor (stay quiet meanwhile)
+        
+        Args:
+            seconds: How much audio to measure
+        """
+        levels = []
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            try:
+                data = self._audio.get(timeout=seconds)
+            except queue.Empty:
+                break
+            if data is None:
+                self._audio.put(None)
+                break
+            levels.append(self._rms(data))
+        
+        if levels:
+            self.noise_floor = float(np.mean(levels))
+            print(f"✅ Noise floor: {self.noise_floor:.0f} RMS")
+    
+    @staticmethod
+    def _rms(data):
+        """RMS level of an int16 PCM chunk"""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.dot(samples, samples) / max(samples.size, 1)))
+    
+    def _is_voiced(self, data):
+        """Energy VAD for one chunk; quiet chunks update the noise floor"""
+        rms = self._rms(data)
+        if rms > max(self.noise_floor * self.NOISE_RATIO, ENERGY_THRESHOLD):
+            return True
+        damping = self.NOISE_DAMPING
+        self.noise_floor = damping * self.noise_floor + (1 - damping) * rms
+        return False
+    
     def listen(self, timeout=None):
         """
         Listen for a complete sentence from the user
@@ -87,52 +202,97 @@ class SpeechToText:
         
         print("\n🎙️  Listening... Speak now!")
         
+        # Start from a clean decoder state every turn
+        self.rec.Reset()
+        
         full_text = []
-        start_time = time.time()
-        self.silence_counter = 0
+        start_time = time.monotonic()
+        silence = 0
         last_partial = ""
         has_spoken = False
+        pending = bytearray()
+        min_accept = self.MIN_ACCEPT * 2  # int16 samples -> bytes
+        pre_roll = deque(maxlen=self.PRE_ROLL)
+        silence_limit = self.silence_chunks
+        
+        # Hot loop: bind methods to locals once
+        now = time.monotonic
+        get_chunk = self._audio.get
+        accept = self.rec.AcceptWaveform
+        result = self.rec.Result
+        partial_result = self.rec.PartialResult
+        search_text = _TEXT_RE.search
+        search_partial = _PARTIAL_RE.search
+        erase = self._ERASE
         
         try:
             while True:
                 # Check timeout
-                if time.time() - start_time > timeout:
+                if now() - start_time > timeout:
                     print("\n⏱️  Timeout reached")
                     break
                 
-                # Read audio data
-                data = self.stream.read(CHUNK_SIZE, exception_on_overflow=False)
+                # Next chunk from the audio callback
+                try:
+                    data = get_chunk(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if data is None:
+                    print("\n❌ Microphone stopped")
+                    self._audio.put(None)  # Keep later calls from waiting
+                    break
                 
-                # Process with Vosk
-                if self.rec.AcceptWaveform(data):
-                    result = json.loads(self.rec.Result())
-                    text = result.get("text", "").strip()
-                    
-                    if text:
-                        has_spoken = True
-                        full_text.append(text)
-                        print(f"\r📝 {text}" + " " * 20)
-                        self.silence_counter = 0
-                    else:
-                        if has_spoken:
-                            self.silence_counter += 1
-                else:
-                    partial = json.loads(self.rec.PartialResult())
-                    partial_text = partial.get("partial", "")
-                    
-                    if partial_text and partial_text != last_partial:
-                        has_spoken = True
-                        print(f"\r💬 {partial_text}", end='', flush=True)
-                        last_partial = partial_text
-                        self.silence_counter = 0
+                # Energy VAD against the adaptive noise floor
+                voiced = self._is_voiced(data)
+                
+                # Leading silence: keep a little audio, but skip Vosk
+                if not has_spoken:
+                    if not voiced:
+                        pre_roll.append(data)
+                        continue
+                    has_spoken = True
+                    for chunk in pre_roll:
+                        pending += chunk
+                    pre_roll.clear()
+                
+                silence = 0 if voiced else silence + 1
+                pending += data
+                
+                # Process with Vosk once a full batch is buffered
+                if len(pending) >= min_accept:
+                    if accept(bytes(pending)):
+                        match = search_text(result())
+                        text = match.group(1).strip() if match else ""
+                        
+                        if text:
+                            full_text.append(text)
+                            print(f"\r📝 {text}{erase}")
                     else:
-                        if has_spoken:
-                            self.silence_counter += 1
+                        match = search_partial(partial_result())
+                        partial_text = match.group(1) if match else ""
+                        
+                        if partial_text and partial_text != last_partial:
+                            print(f"\r💬 {partial_text}{erase}", end='', flush=True)
+                            last_partial = partial_text
+                    del pending[:]
                 
                 # Stop if silence after speech
-                if has_spoken and self.silence_counter > SILENCE_THRESHOLD:
-                    print("\n🔇 Speech complete")
-                    break
+                if silence > silence_limit:
+                    if pending:
+                        accept(bytes(pending))
+                        del pending[:]
+                    match = search_text(self.rec.FinalResult())
+                    text = match.group(1).strip() if match else ""
+                    if text:
+                        full_text.append(text)
+                        print(f"\r📝 {text}{erase}")
+                    if full_text:
+                        print("\n🔇 Speech complete")
+                        break
+                    
+                    # Just noise: keep listening
+                    has_spoken = False
+                    silence = 0
         
         except KeyboardInterrupt:
             print("\n⏹️  Stopped listening")
@@ -140,6 +300,8 @@ class SpeechToText:
         except Exception as e:
             print(f"\n❌ Error during listening: {e}")
             return ""
+        finally:
+            self.silence_counter = silence
         
         final_text = " ".join(full_text).strip()
         
@@ -150,6 +312,23 @@ class SpeechToText:
         
         return final_text
     
+    def flush(self):
+        """
+        Drop audio captured since the last listen()
+        
+        The microphone stays open between exchanges, so whatever was
+        recorded meanwhile (e.g. our own TTS playback) is still queued.
+        """
+        while True:
+            try:
+                data = self._audio.get_nowait()
+            except queue.Empty:
+                break
+            if data is None:
+                self._audio.put(None)
+                break
+        self.rec.Reset()
+    
     def close(self):
         """Clean up resources"""
         print("\n🔧 Closing microphone...")
@@ -159,6 +338,9 @@ class SpeechToText:
                 self.stream.stop_stream()
             self.stream.close()
         
+        # Wake up a listen() waiting for audio
+        self._put(None)
+        
         if self.p:
             self.p.terminate()
         
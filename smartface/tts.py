@@ -1,8 +1,33 @@
+import os
 import platform
+import re
 import subprocess
+import tempfile
+import time
+from functools import lru_cache
 import pyttsx3
 from smartface.config import TTS_RATE
 
+# One `say -v ?` line: "<name>  <locale>  # <sample sentence>"
+_VOICE_RE = re.compile(r'^(.+?)\s+([a-z]{2,3}[_-]\w+)\s+#', re.MULTILINE)
+
+
+@lru_cache(maxsize=1)
+def _enumerate_macos_voices():
+    """
+    Installed macOS voices, listed once per process
+    
+    Returns:
+        tuple: (name, locale) pairs
+    """
+    result = subprocess.run(
+        ['say', '-v', '?'],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return tuple(_VOICE_RE.findall(result.stdout))
+
 
 class TextToSpeech:
     """
@@ -29,14 +54,16 @@ class TextToSpeech:
         print("✅ Text-to-Speech ready")
     
     def _test_native(self):
-        """Test that native say command works"""
+        """Test that native say command works (silently, also loads the voice)"""
         try:
-            subprocess.run(
-                ['say', '-v', self.voice, 'Ready'],
-                check=True,
-                capture_output=True,
-                timeout=3
-            )
+            with tempfile.TemporaryDirectory() as tmp:
+                subprocess.run(
+                    ['say', '-v', self.voice, '-o', os.path.join(tmp, 'warmup.wav'),
+                     '--file-format=WAVE', '--data-format=LEI16@22050', 'Ready'],
+                    check=True,
+                    capture_output=True,
+                    timeout=3
+                )
         except Exception as e:
             print(f"⚠️  Native speech test failed: {e}")
             print("Falling back to pyttsx3...")
@@ -53,18 +80,23 @@ class TextToSpeech:
             else:
                 self.engine = pyttsx3.init()
             
+            # pyttsx3.init() reuses one engine per driver. Except on macOS
+            # (whose driver needs the Cocoa run loop), speak() drives it
+            # with an external loop instead of a runAndWait() per text
+            self._external_loop = self.system != 'darwin'
+            self._loop_started = False
+            
             self.engine.setProperty('volume', 1.0)
             self.engine.setProperty('rate', TTS_RATE)
             
-            voices = self.engine.getProperty('voices')
-            if voices:
-                if voice_name:
-                    for voice in voices:
-                        if voice_name.lower() in voice.name.lower():
-                            self.engine.setProperty('voice', voice.id)
-                            break
-                else:
-                    self.engine.setProperty('voice', voices[0].id)
+            # Installed voices, read once and indexed by lowercase name
+            self._voices = self.engine.getProperty('voices') or []
+            self._voice_by_name = {v.name.lower(): v for v in self._voices}
+            
+            if self._voices:
+                voice = self._find_voice(voice_name) if voice_name else self._voices[0]
+                if voice:
+                    self.engine.setProperty('voice', voice.id)
             
             print("✅ pyttsx3 initialized")
         except Exception as e:
@@ -73,7 +105,7 @@ class TextToSpeech:
     
     def speak(self, text):
         """
-        Speak the given text
+        Speak the given text (returns when done)
         
         Args:
             text: Text to speak
@@ -86,7 +118,7 @@ class TextToSpeech:
         if self.use_native:
             self._speak_native(text)
         else:
-            self._speak_pyttsx3(text)
+            self._speak_pyttsx3(text.strip())
     
     def _speak_native(self, text):
         """Speak using macOS native say command"""
@@ -106,13 +138,40 @@ class TextToSpeech:
             print(f"❌ Error speaking (native): {e}")
     
     def _speak_pyttsx3(self, text):
-        """Speak using pyttsx3"""
+        """Speak using pyttsx3 (always from the same thread)"""
         try:
+            if not self._external_loop:
+                self.engine.say(text)
+                self.engine.runAndWait()
+                return
+            
+            # Start the loop on this thread once, before the first say()
+            if not self._loop_started:
+                self.engine.startLoop(False)
+                self.engine.iterate()
+                self._loop_started = True
+            
             self.engine.say(text)
-            self.engine.runAndWait()
+            deadline = time.monotonic() + 30
+            while self.engine.isBusy():
+                if time.monotonic() > deadline:
+                    print("⚠️  Speech timeout")
+                    self.engine.stop()
+                    break
+                self.engine.iterate()
+                time.sleep(0.01)
         except Exception as e:
             print(f"❌ Error speaking (pyttsx3): {e}")
     
+    def close(self):
+        """Stop the pyttsx3 loop"""
+        if getattr(self, '_loop_started', False):
+            try:
+                self.engine.endLoop()
+            except Exception:
+                pass
+            self._loop_started = False
+    
     def set_rate(self, rate):
         """
         Set speaking rate
@@ -151,32 +210,32 @@ class TextToSpeech:
         Args:
             voice_name: Voice name (e.g., 'Samantha', 'Alex', 'Daniel')
         """
-        if self.use_native:
-            self.voice = voice_name
-            print(f"✅ Voice set to: {voice_name}")
-        else:
-            self.set_voice_by_name(voice_name)
+        return self.set_voice_by_name(voice_name)
     
     def list_voices(self):
-        """List all available voices"""
+        """
+        List all available voices
+        
+        Returns:
+            list: (name, locale) pairs with native speech, pyttsx3 voices otherwise
+        """
         if self.use_native:
             print("\n📢 Listing macOS voices:")
             try:
-                result = subprocess.run(
-                    ['say', '-v', '?'],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                print(result.stdout)
+                voices = list(_enumerate_macos_voices())
             except Exception as e:
                 print(f"❌ Error listing voices: {e}")
-        else:
-            if hasattr(self, 'engine'):
-                voices = self.engine.getProperty('voices')
-                print("\n📢 Available voices:")
-                for i, voice in enumerate(voices):
-                    print(f"  {i}: {voice.name}")
+                return []
+            print("\n".join(f"  {i}: {name} ({locale})"
+                            for i, (name, locale) in enumerate(voices)))
+            return voices
+        
+        if not hasattr(self, 'engine'):
+            return []
+        print("\n📢 Available voices:")
+        for i, voice in enumerate(self._voices):
+            print(f"  {i}: {voice.name}")
+        return self._voices
     
     def set_voice_by_name(self, name):
         """
@@ -186,22 +245,48 @@ class TextToSpeech:
             name: Voice name (partial match works)
         """
         if self.use_native:
-            self.voice = name
-            print(f"✅ Voice set to: {name}")
-            return True
+            return self._set_native_voice(name)
         
         if not hasattr(self, 'engine'):
             return False
         
         try:
-            voices = self.engine.getProperty('voices')
-            for voice in voices:
-                if name.lower() in voice.name.lower():
-                    self.engine.setProperty('voice', voice.id)
-                    print(f"✅ Voice changed to: {voice.name}")
-                    return True
+            voice = self._find_voice(name)
+            if voice:
+                self.engine.setProperty('voice', voice.id)
+                print(f"✅ Voice changed to: {voice.name}")
+                return True
             print(f"❌ Voice '{name}' not found")
             return False
         except Exception as e:
             print(f"❌ Error changing voice: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def _find_voice(self, name):
+        """pyttsx3 voice by exact name, else first partial match (or None)"""
+        wanted = name.lower()
+        voice = self._voice_by_name.get(wanted)
+        if voice is None:
+            voice = next((v for key, v in self._voice_by_name.items() if wanted in key), None)
+        return voice
+    
+    def _set_native_voice(self, name):
+        """Select a macOS voice, checked against the cached voice list"""
+        try:
+            voices = _enumerate_macos_voices()
+        except Exception:
+            voices = ()
+        
+        if voices:
+            wanted = name.lower()
+            for voice_name, _ in voices:
+                if wanted in voice_name.lower():
+                    name = voice_name
+                    break
+            else:
+                print(f"❌ Voice '{name}' not found")
+                return False
+        
+        self.voice = name
+        print(f"✅ Voice set to: {name}")
+        return True
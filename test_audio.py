@@ -0,0 +1,53 @@
+import numpy as np
+import scipy.signal as signal
+
+from smartface.audio.preprocessor import AudioPreprocessor
+
+
+def _tone(seconds=0.5, rate=16000):
+    """440 Hz tone with a little noise, as int16"""
+    t = np.arange(int(seconds * rate)) / rate
+    noise = np.random.default_rng(0).normal(0, 80, t.size)
+    return (3000 * np.sin(2 * np.pi * 440 * t) + noise).astype(np.int16)
+
+
+def test_preprocess_bytes():
+    """Raw bytes (read-only buffer) preprocess like the same int16 array"""
+    pre = AudioPreprocessor()
+    audio = _tone()
+
+    from_bytes = pre.preprocess(audio.tobytes())
+    from_array = pre.preprocess(audio)
+
+    assert from_bytes.dtype == np.int16
+    assert from_bytes.shape == audio.shape
+    assert np.array_equal(from_bytes, from_array)
+
+
+def _enhance_reference(audio, sample_rate=16000):
+    """The original scipy.signal.stft / istft spectral subtraction"""
+    _, t, Zxx = signal.stft(audio.astype(np.float32), fs=sample_rate)
+    noise_frames = int(0.5 * len(t))
+    noise = np.mean(np.abs(Zxx[:, :noise_frames]), axis=1, keepdims=True)
+    magnitude = np.abs(Zxx)
+    clean = np.maximum(magnitude - 2 * noise, 0.1 * magnitude)
+    _, enhanced = signal.istft(clean * np.exp(1j * np.angle(Zxx)), fs=sample_rate)
+    return enhanced.astype(np.int16)
+
+
+def test_enhance_speech_matches_stft():
+    """enhance_speech gives the scipy STFT result (within float32 rounding)"""
+    pre = AudioPreprocessor()
+    for seconds in (0.1, 0.5, 1.3):
+        audio = _tone(seconds)
+        expected = _enhance_reference(audio)
+        enhanced = pre.enhance_speech(audio)
+
+        assert enhanced.shape == expected.shape
+        assert np.abs(enhanced.astype(np.int32) - expected).max() <= 1
+
+
+if __name__ == "__main__":
+    test_preprocess_bytes()
+    test_enhance_speech_matches_stft()
+    print("✅ Audio tests passed")
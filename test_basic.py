@@ -1,6 +1,5 @@
 from smartface.stt import SpeechToText
 from smartface.tts import TextToSpeech
-import time
 
 def test_tts():
     """Test Text-to-Speech"""
@@ -37,26 +36,25 @@ def test_both():
     tts = TextToSpeech()
     
     try:
+        # speak() returns once playback is done
         tts.speak("Hello! Say something and I will repeat it.")
-        time.sleep(1)  # Wait for TTS to finish
         
+        # Drop our own voice picked up by the microphone
+        stt.flush()
         text = stt.listen()
         
         if text:
             response = f"You said: {text}"
             print(f"\n🤖 {response}")
-            time.sleep(0.5)
             tts.speak(response)
-            time.sleep(1)  # Wait for TTS to finish before closing
         else:
             tts.speak("I didn't hear anything. Please try again.")
-            time.sleep(1)
             
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        time.sleep(1)  # Give time for audio to finish
         stt.close()
+        tts.close()
         print("\n✅ Test completed!")
 
 
@@ -75,7 +73,6 @@ def test_conversation():
         welcome = "Hello! I'm SmartFace. I'm ready for conversation. Say exit to quit."
         print(f"🤖 {welcome}")
         tts.speak(welcome)
-        time.sleep(1)
         
         exchange_count = 0
         
@@ -84,7 +81,8 @@ def test_conversation():
             exchange_count += 1
             print(f"\n--- Exchange {exchange_count} ---")
             
-            # Listen
+            # Listen (dropping audio recorded while we spoke)
+            stt.flush()
             text = stt.listen()
             
             # Handle empty input
@@ -92,7 +90,6 @@ def test_conversation():
                 response = "I didn't catch that. Please try again."
                 print(f"🤖 {response}")
                 tts.speak(response)
-                time.sleep(0.5)
                 continue
             
             # Check for exit commands
@@ -100,7 +97,6 @@ def test_conversation():
                 farewell = "Goodbye! Have a great day!"
                 print(f"🤖 {farewell}")
                 tts.speak(farewell)
-                time.sleep(1)
                 break
             
             # Echo back what user said
@@ -108,17 +104,14 @@ def test_conversation():
             print(f"🤖 {response}")
             tts.speak(response)
             
-            # Small pause between exchanges
-            time.sleep(3)
-            
     except KeyboardInterrupt:
         print("\n\n⏹️  Interrupted by user")
         tts.speak("Goodbye!")
-        time.sleep(1)
     except Exception as e:
         print(f"\n❌ Error: {e}")
     finally:
         stt.close()
+        tts.close()
         print("\n✅ Conversation ended!")
 
 
@@ -0,0 +1,94 @@
+import io
+import wave
+
+import numpy as np
+
+from smartface.codec import (
+    mulaw_encode, mulaw_decode, parse_pcm_rate, parse_wav, validate_rate
+)
+
+
+def test_mulaw_roundtrip():
+    """Decoding then re-encoding gives back every μ-law code"""
+    # 0x7F is -0, which decodes to the same sample as +0 (0xFF)
+    codes = bytes(c for c in range(256) if c != 0x7F)
+    assert mulaw_encode(mulaw_decode(codes)) == codes
+
+
+def test_mulaw_error():
+    """μ-law stays within its quantization step of the original PCM"""
+    pcm = np.linspace(-32000, 32000, 4001).astype(np.int16)
+    decoded = np.frombuffer(mulaw_decode(mulaw_encode(pcm.tobytes())), dtype=np.int16)
+
+    assert decoded.shape == pcm.shape
+    magnitude = np.abs(pcm.astype(np.int32))
+    error = np.abs(decoded.astype(np.int32) - pcm)
+    # Half a step; steps are 1/16 of the segment start (magnitude + bias)
+    assert np.all(error <= (magnitude + 132) // 32 + 1)
+
+
+def test_parse_pcm_rate():
+    """Rate comes from the content-type parameter, else the default"""
+    assert parse_pcm_rate('audio/L16; rate=8000; channels=1') == 8000
+    assert parse_pcm_rate('audio/PCMU;RATE=44100') == 44100
+    assert parse_pcm_rate('audio/L16') == 16000
+    assert parse_pcm_rate('audio/L16; rate=abc', default=22050) == 22050
+    assert parse_pcm_rate('') == 16000
+
+
+def test_validate_rate():
+    """Only known sample rates are accepted"""
+    assert validate_rate(16000) == 16000
+    assert validate_rate('48000') == 48000
+
+    for bad in (0, -16000, 99, 16001, 'abc', None, '16k'):
+        try:
+            validate_rate(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {bad!r}")
+
+
+def _wav(pcm, rate, extra_chunk=b''):
+    """WAV bytes, optionally with a chunk inserted before 'data'"""
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm)
+    data = buf.getvalue()
+    if extra_chunk:
+        pos = data.index(b'data')
+        data = data[:pos] + extra_chunk + data[pos:]
+    return data
+
+
+def test_parse_wav():
+    """parse_wav finds the rate and samples, skipping unknown chunks"""
+    pcm = np.arange(-500, 500, dtype=np.int16).tobytes()
+
+    rate, samples = parse_wav(_wav(pcm, 22050))
+    assert rate == 22050
+    assert bytes(samples) == pcm
+
+    # Odd-sized LIST chunk: padded to an even length
+    rate, samples = parse_wav(_wav(pcm, 8000, b'LIST\x03\x00\x00\x00abc\x00'))
+    assert rate == 8000
+    assert bytes(samples) == pcm
+
+    for bad in (b'', b'not a wav file at all', _wav(pcm, 16000)[:40]):
+        try:
+            parse_wav(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {bad[:12]!r}")
+
+
+if __name__ == "__main__":
+    test_mulaw_roundtrip()
+    test_mulaw_error()
+    test_parse_pcm_rate()
+    test_validate_rate()
+    test_parse_wav()
+    print("✅ Codec tests passed")
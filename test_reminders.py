@@ -0,0 +1,83 @@
+import os
+import tempfile
+
+import smartface.skills.reminder as reminder_module
+from smartface.skills.reminder import ReminderSkill
+
+
+def _use_dir(path):
+    """Point the reminder files at a temporary directory"""
+    reminder_module.REMINDERS_FILE = os.path.join(path, 'reminders.json')
+    reminder_module.REMINDERS_LOG = reminder_module.REMINDERS_FILE + '.wal'
+
+
+def _logged_changes():
+    """Log a few changes without flushing them; return the log contents"""
+    skill = ReminderSkill()
+    skill.FLUSH_DELAY = 60
+    skill.add_reminder("buy milk")
+    skill.add_reminder("call mom")
+    skill.add_reminder("water plants")
+    skill.complete_reminder(1)
+    skill.delete_reminder(3)
+    with open(reminder_module.REMINDERS_LOG, 'rb') as f:
+        log = f.read()
+    # Drop the pending write so nothing is saved at exit
+    skill._flush_timer.cancel()
+    skill._dirty = False
+    return log, [dict(r) for r in skill.reminders]
+
+
+def test_replay_torn_log():
+    """A half-written last line is ignored; earlier changes are replayed"""
+    saved = reminder_module.REMINDERS_FILE, reminder_module.REMINDERS_LOG
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            _use_dir(tmp)
+            log, expected = _logged_changes()
+
+            # Crash while appending one more change
+            with open(reminder_module.REMINDERS_LOG, 'wb') as f:
+                f.write(log + b'{"op": "add", "r": {"id": 4, "te')
+
+            skill = ReminderSkill()
+            assert skill.reminders == expected
+            assert skill.count_reminders() == 1
+            assert skill._next_id == 3
+
+            # Replayed changes are in the snapshot, the log is empty again
+            assert os.path.getsize(reminder_module.REMINDERS_LOG) == 0
+            assert ReminderSkill().reminders == expected
+    finally:
+        reminder_module.REMINDERS_FILE, reminder_module.REMINDERS_LOG = saved
+
+
+def test_replay_twice():
+    """Replaying a log already in the snapshot changes nothing"""
+    saved = reminder_module.REMINDERS_FILE, reminder_module.REMINDERS_LOG
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            _use_dir(tmp)
+            log, expected = _logged_changes()
+            assert ReminderSkill().reminders == expected
+
+            # Crash after the snapshot was written, before the log was emptied
+            with open(reminder_module.REMINDERS_LOG, 'wb') as f:
+                f.write(log)
+
+            skill = ReminderSkill()
+            assert skill.reminders == expected
+
+            # ...and once more on top of that
+            with open(reminder_module.REMINDERS_LOG, 'wb') as f:
+                f.write(log)
+            assert skill._replay_log() == log.count(b'\n')
+            assert skill.reminders == expected
+    finally:
+        reminder_module.REMINDERS_FILE, reminder_module.REMINDERS_LOG = saved
+
+
+if __name__ == "__main__":
+    test_replay_torn_log()
+    test_replay_twice()
+    print("✅ Reminder tests passed")
@@ -8,22 +8,21 @@ GPIO.setmode(GPIO.BCM)
 LED1 = 17
 LED2 = 18
 
+LEDS = [LED1, LED2]
+
 # Configuration des broches
-GPIO.setup(LED1, GPIO.OUT)
-GPIO.setup(LED2, GPIO.OUT)
+GPIO.setup(LEDS, GPIO.OUT)
 
 print("Test de deux LEDs (GPIO17 et GPIO18) — Ctrl+C pour arrêter")
 
 try:
     while True:
-        # Allume LED1, éteint LED2
-        GPIO.output(LED1, GPIO.HIGH)
-        GPIO.output(LED2, GPIO.LOW)
+        # Allume LED1, éteint LED2 (un seul appel pour les deux broches)
+        GPIO.output(LEDS, (GPIO.HIGH, GPIO.LOW))
         time.sleep(0.5)
 
         # Inverse
-        GPIO.output(LED1, GPIO.LOW)
-        GPIO.output(LED2, GPIO.HIGH)
+        GPIO.output(LEDS, (GPIO.LOW, GPIO.HIGH))
         time.sleep(0.5)
 
 except KeyboardInterrupt: